@@ -2,8 +2,13 @@ import psycopg2
 import pandas as pd
 from dotenv import load_dotenv
 import os
+import sys
 from psycopg2.extras import execute_batch
 
+# Index h2h en mémoire : supabase/load/index_h2h.py
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'supabase', 'load'))
+from index_h2h import IndexH2H
+
 load_dotenv()
 
 USER = os.getenv("user")
@@ -64,27 +69,29 @@ def fetch_h2h(home_team_id, away_team_id):
     conn.close()
     return df
 
-def generate_training_dataset(season_label):
+def generate_training_dataset(season_label, h2h_index=None):
+    """
+    h2h : IndexH2H (construit ici si absent) au lieu d'un fetch_h2h par match. Comme fetch_h2h,
+    sans filtre de date : les 5 dernières confrontations connues, donc vues d'après le dernier match.
+    """
     calendar_df = fetch_season_calendar(season_label)
     team_stats_df = fetch_team_stats(season_label)
     team_stats_map = team_stats_df.set_index('team_id').to_dict(orient='index')
+    if h2h_index is None:
+        h2h_index = IndexH2H.from_database()
+    apres_tous_matchs = h2h_index.unique_dates[-1] + pd.Timedelta(days=1)
+    h2h = h2h_index.features(
+        calendar_df['home_team_id'], calendar_df['away_team_id'], [apres_tous_matchs] * len(calendar_df)
+    )
     rows = []
 
-    for _, match in calendar_df.iterrows():
+    for (_, match), h2h_match in zip(calendar_df.iterrows(), h2h.to_dict(orient='records')):
         home_id = match['home_team_id']
         away_id = match['away_team_id']
 
         home_stats = team_stats_map.get(home_id, {})
         away_stats = team_stats_map.get(away_id, {})
 
-        h2h_df = fetch_h2h(home_id, away_id)
-        h2h_home_wins = ((h2h_df['home_team_id'] == home_id) & (h2h_df['home_goals'] > h2h_df['away_goals'])).sum()
-        h2h_away_wins = ((h2h_df['away_team_id'] == away_id) & (h2h_df['away_goals'] > h2h_df['home_goals'])).sum()
-        h2h_draws = ((h2h_df['home_goals'] == h2h_df['away_goals'])).sum()
-        h2h_avg_goal_diff_home = ((h2h_df['home_goals'] - h2h_df['away_goals']).mean() if not h2h_df.empty else 0)
-        h2h_avg_goals_home_scored = h2h_df['home_goals'].mean() if not h2h_df.empty else 0
-        h2h_avg_goals_away_scored = h2h_df['away_goals'].mean() if not h2h_df.empty else 0
-
         row = {
             'match_id': match['match_id'],
             'season_label': season_label,
@@ -117,12 +124,12 @@ def generate_training_dataset(season_label):
             'dangerous_attacks_avg_so_far_home': home_stats.get('dangerous_attacks_avg', 0),
             'dangerous_attacks_avg_so_far_away': away_stats.get('dangerous_attacks_avg', 0),
 
-            'h2h_home_wins': h2h_home_wins,
-            'h2h_away_wins': h2h_away_wins,
-            'h2h_draws': h2h_draws,
-            'h2h_avg_goal_diff_home': h2h_avg_goal_diff_home,
-            'h2h_avg_goals_home_scored': h2h_avg_goals_home_scored,
-            'h2h_avg_goals_away_scored': h2h_avg_goals_away_scored,
+            'h2h_home_wins': h2h_match['h2h_home_wins'],
+            'h2h_away_wins': h2h_match['h2h_away_wins'],
+            'h2h_draws': h2h_match['h2h_draws'],
+            'h2h_avg_goal_diff_home': h2h_match['h2h_avg_goal_diff_home'],
+            'h2h_avg_goals_home_scored': h2h_match['h2h_avg_goals_home_scored'],
+            'h2h_avg_goals_away_scored': h2h_match['h2h_avg_goals_away_scored'],
 
             'result': None
         }
@@ -151,8 +158,9 @@ def insert_training_dataset(df, table="training_dataset"):
 
 if __name__ == "__main__":
     seasons = ["2019/2020", "2020/2021", "2021/2022", "2022/2023", "2023/2024", "2024/2025"]
+    h2h_index = IndexH2H.from_database()  # match_stats chargé une fois pour toutes les saisons
     for season_label in seasons:
         print(f"📦 Génération dataset pour la saison {season_label}")
-        df = generate_training_dataset(season_label)
+        df = generate_training_dataset(season_label, h2h_index)
         insert_training_dataset(df)
         print(f"✅ Saison {season_label} insérée dans la base")
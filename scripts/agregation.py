@@ -0,0 +1,232 @@
+import numpy as np
+import pandas as pd
+
+# Nombre d'équipes reléguées (3 dernières places)
+N_RELEGUES = 3
+
+
+def calculer_rangs(points):
+    """Rang de chaque équipe dans chaque simulation (1 = premier, ex-aequo au rang min)"""
+    n_equipes = points.shape[1]
+    ordre = np.argsort(-points, axis=1, kind='stable')
+    tries = np.take_along_axis(points, ordre, axis=1)
+
+    # Une position ne démarre un nouveau rang que si les points changent
+    nouveau_rang = np.ones(tries.shape, dtype=bool)
+    nouveau_rang[:, 1:] = tries[:, 1:] != tries[:, :-1]
+    positions = np.arange(n_equipes, dtype=np.int16)
+    rangs_tries = np.maximum.accumulate(np.where(nouveau_rang, positions, 0), axis=1) + 1
+
+    rangs = np.empty_like(rangs_tries)
+    np.put_along_axis(rangs, ordre, rangs_tries, axis=1)
+    return rangs
+
+
+def compter_histogramme(points, max_points=None, taille_bloc=100_000):
+    """
+    Histogramme (n_equipes x max_points+1) du nombre de simulations par total de points,
+    avec un seul bincount 2D par bloc (index = équipe * largeur + points)
+    """
+    n_equipes = points.shape[1]
+    if max_points is None:
+        max_points = int(points.max())
+    largeur = max_points + 1
+    decalage = np.arange(n_equipes) * largeur
+    histogramme = np.zeros(n_equipes * largeur, dtype=np.int64)
+    for debut in range(0, len(points), taille_bloc):
+        bloc = np.asarray(points[debut:debut + taille_bloc])
+        histogramme += np.bincount((bloc + decalage).ravel(), minlength=n_equipes * largeur)
+    return histogramme.reshape(n_equipes, largeur)
+
+
+def compter_devant(points, taille_sous_bloc=10_000):
+    """Matrice (n_equipes x n_equipes) : nombre de simulations où A a strictement plus de points que B"""
+    n_equipes = points.shape[1]
+    comptes = np.zeros((n_equipes, n_equipes), dtype=np.int64)
+    # Comparaisons (n x n_equipes x n_equipes) par sous-blocs pour borner la mémoire
+    for debut in range(0, len(points), taille_sous_bloc):
+        bloc = points[debut:debut + taille_sous_bloc]
+        comptes += (bloc[:, :, None] > bloc[:, None, :]).sum(axis=0)
+    return comptes
+
+
+def compter_conjoints(dans_a, dans_b):
+    """
+    Matrice (n_equipes x n_equipes) : nombre de simulations où A vérifie l'évènement a
+    et B l'évènement b, à partir des indicatrices (n_simulations x n_equipes).
+    Produit en float64 (BLAS, le matmul entier de NumPy ne l'est pas) : exact tant que
+    n_simulations < 2**53.
+    """
+    return np.rint(dans_a.astype(np.float64).T @ dans_b.astype(np.float64)).astype(np.int64)
+
+
+def compter_titre_relegation(rangs):
+    """Simulations où A est champion et B relégué (rangs de calculer_rangs)"""
+    n_equipes = rangs.shape[1]
+    return compter_conjoints(rangs == 1, rangs > n_equipes - N_RELEGUES)
+
+
+def probabilites_depuis_comptes(comptes_positions, n_simulations, equipes):
+    """{equipe: {position: probabilité}} à partir de la matrice (n_equipes x n_positions)"""
+    probabilites = {}
+    for j, equipe in enumerate(equipes):
+        positions = np.flatnonzero(comptes_positions[j])
+        probabilites[equipe] = {int(pos) + 1: comptes_positions[j, pos] / n_simulations for pos in positions}
+    return probabilites
+
+
+def probabilites_relatives(comptes_devant, comptes_titre_relegation, n_simulations, equipes):
+    """
+    {'devant': P(A finit devant B), 'titre_et_relegation': P(A champion et B relégué)},
+    DataFrames équipes x équipes (ligne = A, colonne = B)
+    """
+    return {
+        'devant': pd.DataFrame(comptes_devant / n_simulations, index=equipes, columns=equipes),
+        'titre_et_relegation': pd.DataFrame(comptes_titre_relegation / n_simulations, index=equipes, columns=equipes),
+    }
+
+
+def percentile_histogramme(valeurs, cumul, q):
+    """np.percentile (interpolation linéaire) calculé sur un histogramme trié"""
+    n = cumul[-1]
+    h = (n - 1) * (q / 100)
+    i = int(np.floor(h))
+    t = h - i
+    a = float(valeurs[np.searchsorted(cumul, i, side='right')])
+    b = float(valeurs[np.searchsorted(cumul, min(i + 1, n - 1), side='right')])
+    # Même formule que numpy pour rester identique au calcul sur les valeurs brutes
+    if t >= 0.5:
+        return b - (b - a) * (1 - t)
+    return a + (b - a) * t
+
+
+def statistiques_histogramme(comptes):
+    """Statistiques d'une équipe à partir du nombre de simulations par total de points"""
+    valeurs = np.flatnonzero(comptes)
+    effectifs = comptes[valeurs]
+    cumul = np.cumsum(effectifs)
+    n = cumul[-1]
+
+    moyenne = float((valeurs * effectifs).sum() / n)
+    variance = float((effectifs * (valeurs - moyenne) ** 2).sum() / n)
+
+    return {
+        'moyenne_points': moyenne,
+        'mediane_points': percentile_histogramme(valeurs, cumul, 50),
+        'ecart_type': float(np.sqrt(variance)),
+        'min_points': int(valeurs[0]),
+        'max_points': int(valeurs[-1]),
+        'intervalle_confiance_95': [
+            percentile_histogramme(valeurs, cumul, 2.5),
+            percentile_histogramme(valeurs, cumul, 97.5)
+        ]
+    }
+
+
+class AccumulateurSimulations:
+    """
+    Agrégats cumulés bloc par bloc : histogramme exact des points par équipe,
+    comptes de positions finales et moyenne/variance de Welford.
+    La mémoire est en O(n_equipes x max_points) quel que soit le nombre de simulations.
+    """
+
+    def __init__(self, n_equipes, max_points):
+        self.n_equipes = n_equipes
+        self.max_points = max_points
+        self.n_simulations = 0
+        self.histogramme_points = np.zeros((n_equipes, max_points + 1), dtype=np.int64)
+        self.comptes_positions = np.zeros((n_equipes, n_equipes), dtype=np.int64)
+        self.comptes_devant = np.zeros((n_equipes, n_equipes), dtype=np.int64)
+        self.comptes_titre_relegation = np.zeros((n_equipes, n_equipes), dtype=np.int64)
+        self.moyenne = np.zeros(n_equipes)
+        self.m2 = np.zeros(n_equipes)
+
+    @classmethod
+    def depuis_points(cls, points, taille_bloc=100_000):
+        """Agrège une matrice de points existante (éventuellement en memory-map) bloc par bloc"""
+        accumulateur = cls(points.shape[1], int(points.max()))
+        for debut in range(0, len(points), taille_bloc):
+            accumulateur.ajouter_bloc(np.asarray(points[debut:debut + taille_bloc]))
+        return accumulateur
+
+    def ajouter_bloc(self, points):
+        """Intègre un bloc de simulations (n_bloc x n_equipes)"""
+        n_bloc = len(points)
+        if n_bloc == 0:
+            return
+
+        self.histogramme_points += compter_histogramme(points, self.max_points)
+
+        rangs = calculer_rangs(points)
+        decalage = np.arange(self.n_equipes) * self.n_equipes - 1
+        self.comptes_positions += np.bincount(
+            (rangs + decalage).ravel(), minlength=self.n_equipes * self.n_equipes
+        ).reshape(self.n_equipes, self.n_equipes)
+        self.comptes_devant += compter_devant(points)
+        self.comptes_titre_relegation += compter_titre_relegation(rangs)
+
+        moyenne_bloc = points.mean(axis=0)
+        m2_bloc = ((points - moyenne_bloc) ** 2).sum(axis=0)
+        self._fusionner_moments(n_bloc, moyenne_bloc, m2_bloc)
+
+    def fusionner(self, autre):
+        """Ajoute les agrégats d'un autre accumulateur (shard) de mêmes dimensions"""
+        if autre.n_simulations == 0:
+            return
+        self.histogramme_points += autre.histogramme_points
+        self.comptes_positions += autre.comptes_positions
+        self.comptes_devant += autre.comptes_devant
+        self.comptes_titre_relegation += autre.comptes_titre_relegation
+        self._fusionner_moments(autre.n_simulations, autre.moyenne, autre.m2)
+
+    def _fusionner_moments(self, n_bloc, moyenne_bloc, m2_bloc):
+        # Mise à jour de Welford par blocs (formule de Chan)
+        n_total = self.n_simulations + n_bloc
+        delta = moyenne_bloc - self.moyenne
+        self.moyenne = self.moyenne + delta * (n_bloc / n_total)
+        self.m2 = self.m2 + m2_bloc + delta ** 2 * (self.n_simulations * n_bloc / n_total)
+        self.n_simulations = n_total
+
+    def erreurs_standard(self):
+        """
+        Erreur standard Monte Carlo par équipe : titre, top 4, relégation (3 derniers) et points moyens.
+        Les probabilités sont lissées en (k + 1) / (n + 2) : un événement jamais (ou toujours)
+        tiré garde une erreur non nulle au lieu de paraître parfaitement estimé.
+        """
+        n = self.n_simulations
+        comptes = {
+            'titre': self.comptes_positions[:, 0],
+            'top4': self.comptes_positions[:, :4].sum(axis=1),
+            'relegation': self.comptes_positions[:, -N_RELEGUES:].sum(axis=1),
+        }
+        erreurs = {}
+        for cle, k in comptes.items():
+            p = (k + 1) / (n + 2)
+            erreurs[cle] = np.sqrt(p * (1 - p) / n)
+        erreurs['moyenne_points'] = np.sqrt(self.m2 / n / n)
+        return erreurs
+
+    def analyser(self, equipes):
+        """Même structure que MonteCarloSimulator.analyser_resultats"""
+        analyse = {}
+        for j, equipe in enumerate(equipes):
+            stats = statistiques_histogramme(self.histogramme_points[j])
+            stats['moyenne_points'] = float(self.moyenne[j])
+            stats['ecart_type'] = float(np.sqrt(self.m2[j] / self.n_simulations))
+            analyse[equipe] = stats
+
+        analyse['probabilites_classement'] = self.probabilites_classement(equipes)
+        return analyse
+
+    def probabilites_relatives(self, equipes):
+        return probabilites_relatives(
+            self.comptes_devant, self.comptes_titre_relegation, self.n_simulations, equipes
+        )
+
+    def probabilites_classement(self, equipes):
+        return probabilites_depuis_comptes(self.comptes_positions, self.n_simulations, equipes)
+
+    def distribution_points(self, j):
+        """(valeurs, effectifs) des points de l'équipe d'index j"""
+        valeurs = np.flatnonzero(self.histogramme_points[j])
+        return valeurs, self.histogramme_points[j, valeurs]
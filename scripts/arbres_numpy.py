@@ -0,0 +1,154 @@
+import json
+
+import numpy as np
+
+
+class ArbresNumpy:
+    """
+    Évaluateur NumPy d'un booster XGBoost multi:softprob exporté en JSON.
+    Chaque arbre est complété en arbre binaire parfait de profondeur profondeur_max
+    (une feuille peu profonde devient un noeud qui part toujours à gauche), puis
+    aplati en tableaux (n_arbres x n_noeuds) de features, seuils et valeurs de feuille.
+    Un lot de lignes est évalué pour tous les arbres à la fois : toutes les
+    comparaisons en une opération, puis une descente d'un niveau par itération.
+    """
+
+    def __init__(self, features, seuils, defaut_gauche, valeurs_feuilles,
+                 classe_arbre, marge_base, feature_names=None):
+        self.features = features
+        self.seuils = seuils
+        self.defaut_gauche = defaut_gauche
+        self.valeurs_feuilles = valeurs_feuilles
+        self.classe_arbre = classe_arbre
+        self.marge_base = marge_base
+        self.feature_names = feature_names
+        self.n_classes = len(marge_base)
+        self.profondeur_max = int(np.log2(valeurs_feuilles.shape[1]))
+
+    @classmethod
+    def depuis_json(cls, chemin):
+        with open(chemin, encoding='utf-8') as f:
+            learner = json.load(f)['learner']
+
+        objectif = learner['objective']['name']
+        if objectif != 'multi:softprob':
+            raise ValueError(f"Objectif non supporté: {objectif}")
+
+        arbres = learner['gradient_booster']['model']['trees']
+        if any(any(arbre['split_type']) for arbre in arbres):
+            raise ValueError("Les splits catégoriels ne sont pas supportés")
+
+        profondeur = max(cls.profondeur(arbre) for arbre in arbres)
+        n_noeuds, n_feuilles = 2 ** profondeur - 1, 2 ** profondeur
+        features = np.zeros((len(arbres), n_noeuds), dtype=np.int32)
+        seuils = np.full((len(arbres), n_noeuds), np.inf, dtype=np.float32)
+        defaut_gauche = np.ones((len(arbres), n_noeuds), dtype=bool)
+        valeurs_feuilles = np.zeros((len(arbres), n_feuilles))
+
+        for t, arbre in enumerate(arbres):
+            # Parcours en profondeur (pile) : position p dans l'arbre parfait, enfants en 2p+1 / 2p+2
+            a_visiter = [(0, 0)]
+            while a_visiter:
+                noeud, position = a_visiter.pop()
+                gauche = arbre['left_children'][noeud]
+                if position >= n_noeuds:
+                    # Dans le JSON, la valeur d'une feuille est stockée dans split_conditions
+                    valeurs_feuilles[t, position - n_noeuds] = np.float32(arbre['split_conditions'][noeud])
+                elif gauche == -1:
+                    # Feuille avant la profondeur max : seuil infini, les deux branches portent la feuille
+                    a_visiter += [(noeud, 2 * position + 1), (noeud, 2 * position + 2)]
+                else:
+                    features[t, position] = arbre['split_indices'][noeud]
+                    seuils[t, position] = arbre['split_conditions'][noeud]
+                    defaut_gauche[t, position] = bool(arbre['default_left'][noeud])
+                    a_visiter += [(gauche, 2 * position + 1), (arbre['right_children'][noeud], 2 * position + 2)]
+
+        return cls(
+            features=features,
+            seuils=seuils,
+            defaut_gauche=defaut_gauche,
+            valeurs_feuilles=valeurs_feuilles,
+            classe_arbre=np.array(learner['gradient_booster']['model']['tree_info'], dtype=np.int32),
+            marge_base=cls.marge_initiale(learner['learner_model_param']),
+            feature_names=learner.get('feature_names') or None,
+        )
+
+    @staticmethod
+    def profondeur(arbre):
+        gauche, droite = arbre['left_children'], arbre['right_children']
+        profondeurs = [0] * len(gauche)
+        for noeud in range(len(gauche)):
+            if gauche[noeud] != -1:
+                profondeurs[gauche[noeud]] = profondeurs[droite[noeud]] = profondeurs[noeud] + 1
+        return max(profondeurs)
+
+    @staticmethod
+    def marge_initiale(param):
+        """base_score par classe, utilisé tel quel comme marge initiale par XGBoost pour softprob"""
+        n_classes = int(param['num_class'])
+        base = np.array(json.loads(param['base_score']), dtype=np.float64).reshape(-1)
+        if base.size == 1:
+            base = np.repeat(base, n_classes)
+        return base
+
+    def predire_marges(self, X, taille_lot=1024):
+        """Marges (n, n_classes) pour X (n, n_features), NaN = valeur manquante"""
+        X = np.asarray(X, dtype=np.float32)
+        marges = np.empty((len(X), self.n_classes))
+        classes = np.eye(self.n_classes)[self.classe_arbre]
+        n_arbres, n_noeuds = self.seuils.shape
+        arbres = np.arange(n_arbres)
+
+        for debut in range(0, len(X), taille_lot):
+            lot = X[debut:debut + taille_lot]
+            # Toutes les comparaisons (lignes x arbres x noeuds) d'un coup, en float32 comme XGBoost
+            valeurs = lot[:, self.features]
+            va_gauche = valeurs < self.seuils
+            if np.isnan(lot).any():
+                va_gauche = np.where(np.isnan(valeurs), self.defaut_gauche, va_gauche)
+
+            # Descente niveau par niveau avec un index plat (ligne, arbre, position)
+            va_gauche = va_gauche.reshape(-1)
+            base = np.arange(len(lot) * n_arbres).reshape(len(lot), n_arbres) * n_noeuds
+            position = np.zeros((len(lot), n_arbres), dtype=np.intp)
+            for _ in range(self.profondeur_max):
+                position = 2 * position + 2 - va_gauche[base + position]
+            feuilles = self.valeurs_feuilles.reshape(-1)[arbres * (n_noeuds + 1) + position - n_noeuds]
+            marges[debut:debut + len(lot)] = feuilles @ classes + self.marge_base
+
+        return marges
+
+    def predire(self, X):
+        """Probabilités softmax (n, n_classes), mêmes colonnes que Booster.predict"""
+        marges = self.predire_marges(X)
+        marges -= marges.max(axis=1, keepdims=True)
+        probas = np.exp(marges)
+        probas /= probas.sum(axis=1, keepdims=True)
+        return probas
+
+
+if __name__ == "__main__":
+    # Vérification de l'accord avec xgb.Booster.predict et comparaison des temps
+    import time
+    import pandas as pd
+    import xgboost as xgb
+
+    chemin = 'modele_simulation_saison_complete/modele_xgboost_simulation.json'
+    booster = xgb.Booster()
+    booster.load_model(chemin)
+    arbres = ArbresNumpy.depuis_json(chemin)
+
+    df = pd.read_csv('csv_anciennes_versions/processed/dataset_6.csv')[booster.feature_names]
+    ecart = np.abs(arbres.predire(df.to_numpy()) - booster.predict(xgb.DMatrix(df))).max()
+    print(f" Écart max avec Booster.predict: {ecart:.2e}")
+    assert ecart < 1e-6
+
+    for n_lignes in (1, 10, 380, 10_000):
+        X = df.sample(n_lignes, replace=True, random_state=0)
+        valeurs = X.to_numpy(dtype=np.float32)
+        for nom, predire in (('DMatrix', lambda: booster.predict(xgb.DMatrix(X))),
+                             ('NumPy', lambda: arbres.predire(valeurs))):
+            debut = time.perf_counter()
+            for _ in range(20):
+                predire()
+            print(f" {nom:8} {n_lignes:6d} lignes : {(time.perf_counter() - debut) / 20 * 1000:8.3f} ms")
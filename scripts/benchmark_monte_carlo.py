@@ -0,0 +1,245 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.preprocessing import LabelEncoder
+
+from scripts.metriques import rss_pic_mo
+from scripts.monte_carlo import MonteCarloSimulator
+
+# Mêmes colonnes que le modèle de production pour garder la forme réelle des features
+FEATURES = [
+    'season_id', 'home_team_id', 'away_team_id', 'points_home', 'points_away',
+    'goal_diff_home', 'goal_diff_away', 'goals_scored_home', 'goals_scored_away',
+    'goals_conceded_home', 'goals_conceded_away', 'possession_home', 'possession_away',
+    'shots_on_target_home', 'shots_on_target_away', 'h2h_home_wins', 'h2h_away_wins',
+    'h2h_draws', 'h2h_avg_goal_diff_home', 'h2h_avg_goals_home_scored', 'h2h_avg_goals_away_scored'
+]
+EQUIPES_DEFAUT = [10, 20, 30, 40]
+SIMULATIONS_DEFAUT = [1_000, 10_000, 100_000, 1_000_000]
+
+
+def generer_calendrier(n_equipes, rng):
+    """
+    Calendrier aller-retour synthétique : chaque équipe reçoit toutes les autres une fois.
+    Renvoie (df_features, teams_home, teams_away), un niveau tiré par équipe
+    rendant les features cohérentes d'un match à l'autre.
+    """
+    domicile, exterieur = np.nonzero(~np.eye(n_equipes, dtype=bool))
+    niveau = rng.normal(0, 1, n_equipes)
+    n_matchs = len(domicile)
+
+    def bruit(echelle):
+        return rng.normal(0, echelle, n_matchs)
+
+    ecart = niveau[domicile] - niveau[exterieur]
+    df = pd.DataFrame({
+        'season_id': np.full(n_matchs, 2025),
+        'home_team_id': domicile + 1,
+        'away_team_id': exterieur + 1,
+        'points_home': 52 + 15 * niveau[domicile] + bruit(3),
+        'points_away': 52 + 15 * niveau[exterieur] + bruit(3),
+        'goal_diff_home': 20 * niveau[domicile] + bruit(4),
+        'goal_diff_away': 20 * niveau[exterieur] + bruit(4),
+        'goals_scored_home': 50 + 12 * niveau[domicile] + bruit(3),
+        'goals_scored_away': 50 + 12 * niveau[exterieur] + bruit(3),
+        'goals_conceded_home': 50 - 8 * niveau[domicile] + bruit(3),
+        'goals_conceded_away': 50 - 8 * niveau[exterieur] + bruit(3),
+        'possession_home': 50 + 5 * ecart + bruit(2),
+        'possession_away': 50 - 5 * ecart + bruit(2),
+        'shots_on_target_home': 4.5 + niveau[domicile] + bruit(0.5),
+        'shots_on_target_away': 4.5 + niveau[exterieur] + bruit(0.5),
+        'h2h_home_wins': rng.integers(0, 4, n_matchs),
+        'h2h_away_wins': rng.integers(0, 4, n_matchs),
+        'h2h_draws': rng.integers(0, 3, n_matchs),
+        'h2h_avg_goal_diff_home': 0.5 * ecart + bruit(0.5),
+        'h2h_avg_goals_home_scored': 1.4 + 0.3 * niveau[domicile] + bruit(0.3),
+        'h2h_avg_goals_away_scored': 1.2 + 0.3 * niveau[exterieur] + bruit(0.3),
+    })
+    return df[FEATURES], [str(i + 1) for i in domicile], [str(i + 1) for i in exterieur]
+
+
+def entrainer_booster_test(dossier, n_lignes=2000, seed=0):
+    """
+    Entraîne un petit booster multi:softprob sur des matchs synthétiques et l'écrit
+    dans dossier avec un metadata.pkl au format de production.
+    Renvoie (chemin_modele, chemin_metadata).
+    """
+    rng = np.random.default_rng(seed)
+    lignes = []
+    while sum(len(df) for df in lignes) < n_lignes:
+        lignes.append(generer_calendrier(20, rng)[0])
+    X = pd.concat(lignes, ignore_index=True).iloc[:n_lignes]
+
+    # Résultat tiré à partir de l'écart de niveau (avantage du terrain compris)
+    ecart = (X['points_home'] - X['points_away']) / 15 + 0.3
+    p_victoire = 1 / (1 + np.exp(-(ecart - 0.4)))
+    p_defaite = 1 / (1 + np.exp(ecart + 0.4))
+    u = rng.random(len(X))
+    resultats = np.where(u < p_victoire, 'home_win', np.where(u < p_victoire + p_defaite, 'away_win', 'draw'))
+
+    le = LabelEncoder().fit(['away_win', 'draw', 'home_win'])
+    dtrain = xgb.DMatrix(X, label=le.transform(resultats))
+    booster = xgb.train(
+        {'objective': 'multi:softprob', 'num_class': 3, 'max_depth': 3, 'eta': 0.1, 'seed': seed},
+        dtrain, num_boost_round=30
+    )
+
+    chemin_modele = os.path.join(dossier, 'modele_benchmark.json')
+    chemin_metadata = os.path.join(dossier, 'metadata_benchmark.pkl')
+    booster.save_model(chemin_modele)
+    joblib.dump({
+        'performance': {'accuracy_test_reference': float('nan')},
+        'preprocessing': {'label_encoder': le, 'feature_names': FEATURES, 'nombre_features': len(FEATURES)},
+    }, chemin_metadata)
+    return chemin_modele, chemin_metadata
+
+
+def mesurer(simulateur, df_features, teams_home, teams_away, n_simulations,
+            taille_bloc=5000, streaming=False, seed=42):
+    """
+    Un run chronométré de simuler_saison_complete, le point d'entrée public : les temps
+    par phase sont ceux de simulateur.metriques, remises à zéro avant le run.
+    Renvoie (temps total, metriques.resume(), pic mémoire tracemalloc en octets).
+    """
+    simulateur.cache_probas.vider()
+    simulateur.metriques.reinitialiser()
+    tracemalloc.start()
+
+    debut = time.perf_counter()
+    simulateur.simuler_saison_complete(
+        df_features, teams_home, teams_away, n_simulations=n_simulations,
+        seed=seed, taille_bloc=taille_bloc, streaming=streaming
+    )
+    total = time.perf_counter() - debut
+
+    _, pic = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return total, simulateur.metriques.resume(), pic
+
+
+def lancer_benchmark(liste_equipes=EQUIPES_DEFAUT, liste_simulations=SIMULATIONS_DEFAUT,
+                     repetitions=1, taille_bloc=5000, streaming=False, predicteur='xgboost', seed=42):
+    """Mesure chaque combinaison (n_equipes, n_simulations) ; garde le run au meilleur temps total"""
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin_modele, chemin_metadata = entrainer_booster_test(dossier, seed=seed)
+        simulateur = MonteCarloSimulator(
+            predicteur=predicteur, chemin_modele=chemin_modele,
+            chemin_metadata=chemin_metadata, verbeux=False
+        )
+
+    rng = np.random.default_rng(seed)
+    resultats = []
+    for n_equipes in liste_equipes:
+        df_features, teams_home, teams_away = generer_calendrier(n_equipes, rng)
+        for n_simulations in liste_simulations:
+            meilleur, pic_max = None, 0
+            for _ in range(repetitions):
+                total, metriques, pic = mesurer(simulateur, df_features, teams_home, teams_away,
+                                                n_simulations, taille_bloc, streaming, seed)
+                if meilleur is None or total < meilleur[0]:
+                    meilleur = (total, metriques)
+                pic_max = max(pic_max, pic)
+
+            total, metriques = meilleur
+            resultat = {
+                'n_equipes': n_equipes,
+                'n_matchs': len(df_features),
+                'n_simulations': n_simulations,
+                'temps_phases': {phase: entree['mur'] for phase, entree in metriques['phases'].items()},
+                'metriques': metriques,
+                'temps_total': total,
+                'simulations_par_seconde': metriques['simulations_par_seconde'],
+                'simulations_par_seconde_total': n_simulations / total,
+                'memoire_pic_mo': pic_max / 2 ** 20,
+            }
+            resultats.append(resultat)
+            print(f" {n_equipes:3d} équipes | {n_simulations:>9,d} simulations | "
+                  f"{resultat['simulations_par_seconde_total']:>12,.0f} sim/s "
+                  f"(tirage {resultat['simulations_par_seconde']:>12,.0f}) | "
+                  f"{total:8.3f} s | {resultat['memoire_pic_mo']:8.1f} Mo")
+
+    return {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit_courant(),
+        'environnement': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'xgboost': xgb.__version__,
+            'processeur': platform.processor() or platform.machine(),
+            'n_cpu': os.cpu_count(),
+        },
+        'parametres': {
+            'repetitions': repetitions,
+            'taille_bloc': taille_bloc,
+            'streaming': streaming,
+            'predicteur': predicteur,
+            'seed': seed,
+        },
+        # Maximum du process sur tout le benchmark
+        'rss_max_mo': rss_pic_mo(),
+        'resultats': resultats,
+    }
+
+
+def commit_courant():
+    try:
+        # Dépôt du script, quel que soit le dossier d'où le benchmark est lancé
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparer(chemin_reference, chemin_nouveau):
+    """Rapport sim/s de bout en bout et pic mémoire entre deux fichiers de résultats (ratio > 1 = plus rapide)"""
+    with open(chemin_reference, encoding='utf-8') as f:
+        reference = json.load(f)
+    with open(chemin_nouveau, encoding='utf-8') as f:
+        nouveau = json.load(f)
+
+    index = {(r['n_equipes'], r['n_simulations']): r for r in reference['resultats']}
+    print(f" Référence {reference['commit']} -> nouveau {nouveau['commit']}")
+    for r in nouveau['resultats']:
+        ref = index.get((r['n_equipes'], r['n_simulations']))
+        if ref is None:
+            continue
+        ratio = r['simulations_par_seconde_total'] / ref['simulations_par_seconde_total']
+        print(f" {r['n_equipes']:3d} équipes | {r['n_simulations']:>9,d} simulations | "
+              f"x{ratio:5.2f} sim/s | {ref['memoire_pic_mo']:8.1f} -> {r['memoire_pic_mo']:8.1f} Mo")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark du simulateur Monte Carlo sur calendriers synthétiques")
+    parser.add_argument('--equipes', type=int, nargs='+', default=EQUIPES_DEFAUT)
+    parser.add_argument('--simulations', type=int, nargs='+', default=SIMULATIONS_DEFAUT)
+    parser.add_argument('--repetitions', type=int, default=1)
+    parser.add_argument('--taille-bloc', type=int, default=5000)
+    parser.add_argument('--streaming', action='store_true')
+    parser.add_argument('--predicteur', choices=['xgboost', 'numpy'], default='xgboost')
+    parser.add_argument('--sortie', default='benchmark_monte_carlo.json')
+    parser.add_argument('--comparer', metavar='REFERENCE', help="fichier de résultats d'un autre commit")
+    args = parser.parse_args()
+
+    rapport = lancer_benchmark(
+        args.equipes, args.simulations, repetitions=args.repetitions,
+        taille_bloc=args.taille_bloc, streaming=args.streaming, predicteur=args.predicteur
+    )
+    with open(args.sortie, 'w', encoding='utf-8') as f:
+        json.dump(rapport, f, ensure_ascii=False, indent=2)
+    print(f" Résultats écrits dans {args.sortie}")
+
+    if args.comparer:
+        comparer(args.comparer, args.sortie)
@@ -0,0 +1,124 @@
+import hashlib
+import sqlite3
+from collections import OrderedDict
+from contextlib import closing
+
+import numpy as np
+
+
+def hash_fichier(chemin):
+    """Empreinte sha256 d'un fichier (identifie une version du modèle)"""
+    h = hashlib.sha256()
+    with open(chemin, 'rb') as f:
+        for morceau in iter(lambda: f.read(1 << 20), b''):
+            h.update(morceau)
+    return h.hexdigest()
+
+
+def hash_lignes(valeurs):
+    """Empreinte de chaque ligne de features (tableau 2D converti en float64)"""
+    valeurs = np.ascontiguousarray(valeurs, dtype=np.float64)
+    return [hashlib.blake2b(ligne.tobytes(), digest_size=16).hexdigest() for ligne in valeurs]
+
+
+class CacheProbabilites:
+    """
+    Cache LRU des probabilités (défaite, nul, victoire) d'un match, indexé par
+    l'empreinte du modèle et celle de la ligne de features.
+    Un second niveau optionnel sur disque (SQLite) survit aux redémarrages.
+    """
+
+    def __init__(self, taille_max=100_000, chemin_disque=None):
+        self.taille_max = taille_max
+        self.chemin_disque = chemin_disque
+        self.memoire = OrderedDict()
+        self.hits = 0
+        self.hits_disque = 0
+        self.misses = 0
+
+        if chemin_disque is not None:
+            # closing ferme la connexion ; le second `conn` commit (ou rollback) la transaction
+            with closing(sqlite3.connect(chemin_disque)) as conn, conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS probas (
+                        modele TEXT, ligne TEXT,
+                        proba_defaite REAL, proba_nul REAL, proba_victoire REAL,
+                        PRIMARY KEY (modele, ligne)
+                    )
+                """)
+
+    def predire(self, hash_modele, valeurs, predire_lignes):
+        """
+        Probabilités (n, 3) des lignes de valeurs ; seules les lignes absentes des deux
+        niveaux de cache sont passées (une fois chacune) à predire_lignes(indices) -> (k, 3).
+        """
+        cles = hash_lignes(valeurs)
+        probas = np.empty((len(cles), 3))
+        manquants = {}
+
+        for i, cle in enumerate(cles):
+            entree = self.memoire.get((hash_modele, cle))
+            if entree is not None:
+                self.memoire.move_to_end((hash_modele, cle))
+                probas[i] = entree
+                self.hits += 1
+            else:
+                manquants.setdefault(cle, []).append(i)
+
+        if manquants and self.chemin_disque is not None:
+            for cle, ligne in self.lire_disque(hash_modele, list(manquants)).items():
+                indices = manquants.pop(cle)
+                probas[indices] = ligne
+                self.hits_disque += len(indices)
+                self.ajouter_memoire(hash_modele, cle, ligne)
+
+        if manquants:
+            premiers = [indices[0] for indices in manquants.values()]
+            nouvelles = np.asarray(predire_lignes(premiers), dtype=np.float64)
+            for (cle, indices), ligne in zip(manquants.items(), nouvelles):
+                probas[indices] = ligne
+                self.misses += len(indices)
+                self.ajouter_memoire(hash_modele, cle, ligne)
+            if self.chemin_disque is not None:
+                self.ecrire_disque(hash_modele, list(manquants), nouvelles)
+
+        return probas
+
+    def ajouter_memoire(self, hash_modele, cle, ligne):
+        self.memoire[(hash_modele, cle)] = np.array(ligne, dtype=np.float64)
+        self.memoire.move_to_end((hash_modele, cle))
+        while len(self.memoire) > self.taille_max:
+            self.memoire.popitem(last=False)
+
+    def lire_disque(self, hash_modele, cles, taille_lot=500):
+        trouves = {}
+        with closing(sqlite3.connect(self.chemin_disque)) as conn, conn:
+            for debut in range(0, len(cles), taille_lot):
+                lot = cles[debut:debut + taille_lot]
+                requete = f"""
+                    SELECT ligne, proba_defaite, proba_nul, proba_victoire FROM probas
+                    WHERE modele = ? AND ligne IN ({", ".join("?" * len(lot))})
+                """
+                for ligne, *valeurs in conn.execute(requete, [hash_modele, *lot]):
+                    trouves[ligne] = np.array(valeurs, dtype=np.float64)
+        return trouves
+
+    def ecrire_disque(self, hash_modele, cles, probas):
+        with closing(sqlite3.connect(self.chemin_disque)) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO probas VALUES (?, ?, ?, ?, ?)",
+                [(hash_modele, cle, *map(float, ligne)) for cle, ligne in zip(cles, probas)]
+            )
+
+    def statistiques(self):
+        """Compteurs de hits (mémoire / disque), de misses et taille du niveau mémoire"""
+        return {
+            'hits': self.hits,
+            'hits_disque': self.hits_disque,
+            'misses': self.misses,
+            'taille_memoire': len(self.memoire),
+        }
+
+    def vider(self):
+        self.memoire.clear()
+        self.hits = self.hits_disque = self.misses = 0
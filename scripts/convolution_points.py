@@ -0,0 +1,108 @@
+import numpy as np
+
+# Points du domicile pour défaite / nul / victoire ; l'extérieur lit les probabilités à l'envers
+POINTS_RESULTAT = (0, 1, 3)
+
+
+def distributions_exactes(df_probas, idx_domicile, idx_exterieur, n_equipes, points_initiaux=None):
+    """
+    Loi exacte du total de points de chaque équipe, sans tirage : les matchs étant
+    indépendants, elle est le produit de convolution des lois par match (0, 1 ou 3 points).
+    Renvoie pmf (n_equipes x max_points+1), pmf[j, k] = P(équipe j termine avec k points).
+    """
+    probas = df_probas[['proba_defaite', 'proba_nul', 'proba_victoire']].to_numpy(dtype=float)
+    probas = probas / probas.sum(axis=1, keepdims=True)
+
+    # Matchs de chaque équipe, complétés par des matchs à 0 point certain
+    equipes = np.concatenate([idx_domicile, idx_exterieur])
+    lois = np.concatenate([probas, probas[:, ::-1]])
+    ordre = np.argsort(equipes, kind='stable')
+    equipes, lois = equipes[ordre], lois[ordre]
+    matchs_par_equipe = np.bincount(equipes, minlength=n_equipes)
+    rang_match = np.arange(len(equipes)) - np.repeat(np.cumsum(matchs_par_equipe) - matchs_par_equipe, matchs_par_equipe)
+
+    n_matchs_max = int(matchs_par_equipe.max())
+    lois_equipes = np.zeros((n_equipes, n_matchs_max, 3))
+    lois_equipes[:, :, 0] = 1.0
+    lois_equipes[equipes, rang_match] = lois
+
+    # Multiplication polynomiale itérative, toutes les équipes à la fois :
+    # un match déplace la masse de 0, 1 ou 3 points
+    pmf = np.zeros((n_equipes, 3 * n_matchs_max + 1))
+    pmf[:, 0] = 1.0
+    for k in range(n_matchs_max):
+        suivante = np.zeros_like(pmf)
+        for resultat, decalage in enumerate(POINTS_RESULTAT):
+            suivante[:, decalage:] += pmf[:, :pmf.shape[1] - decalage] * lois_equipes[:, k, resultat, None]
+        pmf = suivante
+
+    if points_initiaux is not None:
+        decale = np.zeros((n_equipes, pmf.shape[1] + int(np.max(points_initiaux))))
+        for j, depart in enumerate(points_initiaux):
+            decale[j, depart:depart + pmf.shape[1]] = pmf[j]
+        pmf = decale
+    return pmf
+
+
+def quantile_pmf(pmf, q):
+    """Plus petit total k tel que P(points <= k) >= q / 100"""
+    return int(np.searchsorted(np.cumsum(pmf), q / 100 - 1e-12))
+
+
+def analyser_distributions(pmf, equipes):
+    """Statistiques exactes par équipe, mêmes clés que analyser_resultats plus la loi complète"""
+    valeurs = np.arange(pmf.shape[1])
+    analyse = {}
+    for j, equipe in enumerate(equipes):
+        moyenne = float(pmf[j] @ valeurs)
+        support = np.flatnonzero(pmf[j] > 0)
+        analyse[equipe] = {
+            'moyenne_points': moyenne,
+            'mediane_points': float(quantile_pmf(pmf[j], 50)),
+            'ecart_type': float(np.sqrt(pmf[j] @ (valeurs - moyenne) ** 2)),
+            'min_points': int(support[0]),
+            'max_points': int(support[-1]),
+            'intervalle_confiance_95': [
+                float(quantile_pmf(pmf[j], 2.5)),
+                float(quantile_pmf(pmf[j], 97.5))
+            ],
+            'pmf': pmf[j, :support[-1] + 1],
+        }
+    return analyse
+
+
+if __name__ == "__main__":
+    # Vérification contre une grande simulation Monte Carlo et temps de calcul
+    import time
+    import pandas as pd
+    from scripts.monte_carlo import MonteCarloSimulator
+
+    df = pd.read_csv('csv_anciennes_versions/processed/dataset_6.csv')
+    home = df['home_team_id'].astype(str).tolist()
+    away = df['away_team_id'].astype(str).tolist()
+
+    simulateur = MonteCarloSimulator(verbeux=False)
+    debut = time.perf_counter()
+    analyse_exacte = simulateur.analyser_exact(simulateur.preparer_calendrier(df), home, away)
+    print(f" Distributions exactes : {(time.perf_counter() - debut) * 1000:.1f} ms")
+
+    n_simulations = 200_000
+    analyse_mc, _ = simulateur.simuler_saison_complete(
+        simulateur.preparer_calendrier(df), home, away, n_simulations=n_simulations, seed=0, streaming=True
+    )
+    accumulateur = simulateur.resultats_simulations['accumulateur']
+    equipes = simulateur.resultats_simulations['equipes']
+
+    ecart_pmf = 0.0
+    for j, equipe in enumerate(equipes):
+        exacte, mc = analyse_exacte[equipe], analyse_mc[equipe]
+        # Moyenne à 5 erreurs standard, loi à 5 écarts-types binomiaux près
+        assert abs(exacte['moyenne_points'] - mc['moyenne_points']) < 5 * exacte['ecart_type'] / np.sqrt(n_simulations)
+        pmf = np.zeros(max(len(exacte['pmf']), accumulateur.max_points + 1))
+        pmf[:len(exacte['pmf'])] = exacte['pmf']
+        frequences = np.zeros_like(pmf)
+        frequences[:accumulateur.max_points + 1] = accumulateur.histogramme_points[j] / n_simulations
+        tolerance = 5 * np.sqrt(pmf * (1 - pmf) / n_simulations) + 1e-4
+        assert (np.abs(pmf - frequences) <= tolerance).all(), equipe
+        ecart_pmf = max(ecart_pmf, np.abs(pmf - frequences).max())
+    print(f" Écart max avec {n_simulations} simulations : {ecart_pmf:.2e} (probabilité d'un total)")
@@ -0,0 +1,82 @@
+import time
+from contextlib import contextmanager
+
+import psutil
+
+
+def rss_pic_mo():
+    """Pic de mémoire résidente du process en Mo (peak working set sous Windows, ru_maxrss sinon)"""
+    info = psutil.Process().memory_info()
+    if hasattr(info, 'peak_wset'):
+        return info.peak_wset / 2 ** 20
+    try:
+        import resource
+    except ImportError:
+        return info.rss / 2 ** 20
+    # ru_maxrss est en octets sous macOS, en Ko sous Linux
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / 2 ** 20 if psutil.MACOS else maxrss / 2 ** 10
+
+
+class MetriquesSimulation:
+    """
+    Temps mur / CPU cumulés par phase, lignes prédites et pic RSS d'un MonteCarloSimulator.
+    Les compteurs s'additionnent d'un appel à l'autre jusqu'à reinitialiser().
+    Une phase imbriquée (ex. booster dans prediction) compte aussi dans la phase englobante.
+    hook(nom, temps_mur, temps_cpu, metriques) est appelé à la fin de chaque phase.
+    """
+
+    def __init__(self, hook=None):
+        self.hook = hook
+        self.reinitialiser()
+
+    def reinitialiser(self):
+        self.phases = {}
+        self.lignes_predites = 0
+        self.lignes_cache = 0
+        self.n_simulations = 0
+        self.pic_rss_mo = rss_pic_mo()
+
+    @contextmanager
+    def phase(self, nom):
+        debut_mur, debut_cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            temps_mur = time.perf_counter() - debut_mur
+            temps_cpu = time.process_time() - debut_cpu
+            entree = self.phases.setdefault(nom, {'mur': 0.0, 'cpu': 0.0, 'appels': 0})
+            entree['mur'] += temps_mur
+            entree['cpu'] += temps_cpu
+            entree['appels'] += 1
+            self.pic_rss_mo = max(self.pic_rss_mo, rss_pic_mo())
+            if self.hook is not None:
+                self.hook(nom, temps_mur, temps_cpu, self)
+
+    @property
+    def simulations_par_seconde(self):
+        """Saisons tirées par seconde de la phase tirage (None avant la première simulation)"""
+        tirage = self.phases.get('tirage')
+        if tirage is None or tirage['mur'] == 0:
+            return None
+        return self.n_simulations / tirage['mur']
+
+    def resume(self):
+        """Dictionnaire sérialisable de toutes les métriques"""
+        return {
+            'phases': {nom: dict(entree) for nom, entree in self.phases.items()},
+            'lignes_predites': self.lignes_predites,
+            'lignes_cache': self.lignes_cache,
+            'n_simulations': self.n_simulations,
+            'simulations_par_seconde': self.simulations_par_seconde,
+            'pic_rss_mo': self.pic_rss_mo,
+        }
+
+    def afficher(self):
+        print(f" {'Phase':22} {'Mur (s)':>10} {'CPU (s)':>10} {'Appels':>8}")
+        for nom, entree in self.phases.items():
+            print(f" {nom:22} {entree['mur']:10.3f} {entree['cpu']:10.3f} {entree['appels']:8d}")
+        print(f" Lignes prédites : {self.lignes_predites} (+ {self.lignes_cache} depuis le cache)")
+        if self.simulations_par_seconde is not None:
+            print(f" Simulations : {self.n_simulations} ({self.simulations_par_seconde:,.0f} / s)")
+        print(f" Pic RSS : {self.pic_rss_mo:.1f} Mo")
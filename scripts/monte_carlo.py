@@ -3,59 +3,253 @@ import numpy as np
 import xgboost as xgb
 import joblib
 from tqdm import tqdm
-import matplotlib.pyplot as plt
-import seaborn as sns
-from collections import defaultdict
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 import os
 
+from scripts.arbres_numpy import ArbresNumpy
+from scripts.agregation import (
+    N_RELEGUES, AccumulateurSimulations, calculer_rangs, compter_devant, compter_titre_relegation,
+    compter_histogramme, probabilites_depuis_comptes, probabilites_relatives, statistiques_histogramme
+)
+from scripts.cache_probas import CacheProbabilites, hash_fichier
+from scripts.convolution_points import analyser_distributions, distributions_exactes
+from scripts.metriques import MetriquesSimulation
+from scripts.rapports import FIGURES_COMPARAISON, dessiner_resultats, rendre_rapport
+from scripts.stockage_resultats import charger_resultats, sauvegarder_resultats
+
+CHEMIN_MODELE = 'modele_simulation_saison_complete/modele_xgboost_simulation.json'
+CHEMIN_METADATA = 'modele_simulation_saison_complete/metadata.pkl'
+COLONNES_PROBAS = ['proba_defaite', 'proba_nul', 'proba_victoire']
+
+# Points attribués selon le résultat (0 = Défaite, 1 = Nul, 2 = Victoire du domicile)
+POINTS_DOMICILE = np.array([0, 1, 3])
+POINTS_EXTERIEUR = np.array([3, 1, 0])
+
+# Arrêt adaptatif : nombre minimal de blocs avant de tester la précision
+BLOCS_MIN_ADAPTATIF = 2
+
+# Features de forme mises à jour journée par journée (les buts ne sont pas simulés,
+# goal_diff / goals_scored / goals_conceded restent donc figés)
+FEATURES_FORME = ('points_home', 'points_away')
+
+
+def tirer_points(cdf, idx_domicile, idx_exterieur, n_equipes, n_simulations, rng, points_initiaux=None):
+    """
+    Simule un bloc de saisons en une seule matrice uniforme (n_simulations x n_matchs).
+    points_initiaux (n_equipes,) est ajouté à chaque simulation (saison déjà entamée).
+    cdf (n_membres, n_matchs, 3) : ensemble de modèles, chaque simulation tire un membre.
+    """
+    n_matchs = cdf.shape[-2]
+    u = rng.random((n_simulations, n_matchs))
+
+    # 0 = Défaite, 1 = Nul, 2 = Victoire (même tirage que np.random.choice match par match)
+    if cdf.ndim == 3:
+        membres = (rng.random(n_simulations) * len(cdf)).astype(np.intp)
+        resultats = (u >= cdf[:, :, 0][membres]).astype(np.int8) + (u >= cdf[:, :, 1][membres])
+    else:
+        resultats = (u >= cdf[:, 0]).astype(np.int8) + (u >= cdf[:, 1])
+
+    # Cumul des points par (simulation, équipe) avec un seul bincount
+    decalage = np.arange(n_simulations)[:, None] * n_equipes
+    cles = np.concatenate([(decalage + idx_domicile).ravel(), (decalage + idx_exterieur).ravel()])
+    poids = np.concatenate([POINTS_DOMICILE[resultats].ravel(), POINTS_EXTERIEUR[resultats].ravel()])
+    points = np.bincount(cles, weights=poids, minlength=n_simulations * n_equipes)
+    points = points.reshape(n_simulations, n_equipes).astype(np.int16)
+    if points_initiaux is not None:
+        points += points_initiaux
+    return points
+
+
+def tirer_points_calendriers(cdf, idx_domicile, idx_exterieur, n_equipes, n_simulations, rng):
+    """
+    Simule plusieurs calendriers ensemble : cdf (n_calendriers, n_matchs, 3) et index
+    (n_calendriers, n_matchs) complétés jusqu'au plus long calendrier. Les matchs de
+    bourrage opposent l'équipe puits d'index n_equipes à elle-même et sont ignorés.
+    Renvoie les points (n_calendriers, n_simulations, n_equipes).
+    """
+    n_calendriers, n_matchs = idx_domicile.shape
+    u = rng.random((n_calendriers, n_simulations, n_matchs))
+    resultats = (u >= cdf[:, None, :, 0]).astype(np.int8) + (u >= cdf[:, None, :, 1])
+
+    # Une ligne (calendrier, simulation) par bincount, équipe puits comprise
+    largeur = n_equipes + 1
+    decalage = np.arange(n_calendriers * n_simulations).reshape(n_calendriers, n_simulations, 1) * largeur
+    cles = np.concatenate([(decalage + idx_domicile[:, None, :]).ravel(),
+                           (decalage + idx_exterieur[:, None, :]).ravel()])
+    poids = np.concatenate([POINTS_DOMICILE[resultats].ravel(), POINTS_EXTERIEUR[resultats].ravel()])
+    points = np.bincount(cles, weights=poids, minlength=n_calendriers * n_simulations * largeur)
+    return points.reshape(n_calendriers, n_simulations, largeur)[:, :, :n_equipes].astype(np.int16)
+
+
+def simuler_shard(cdf, idx_domicile, idx_exterieur, n_equipes, n_simulations, graine,
+                  max_points=None, points_initiaux=None):
+    """Simule un shard avec son propre Generator (exécutable dans un autre process)"""
+    points = tirer_points(
+        cdf, idx_domicile, idx_exterieur, n_equipes, n_simulations,
+        np.random.default_rng(graine), points_initiaux
+    )
+    if max_points is None:
+        return points
+    accumulateur = AccumulateurSimulations(n_equipes, max_points)
+    accumulateur.ajouter_bloc(points)
+    return accumulateur
+
+
 class MonteCarloSimulator:
-    def __init__(self):
-        self.charger_modele()
+    def __init__(self, taille_cache=100_000, chemin_cache=None, predicteur='xgboost',
+                 chemin_modele=CHEMIN_MODELE, chemin_metadata=CHEMIN_METADATA,
+                 verbeux=True, hook=None):
+        """
+        chemin_cache : fichier SQLite optionnel pour conserver les probabilités entre sessions.
+        predicteur='numpy' évalue les arbres en NumPy (ArbresNumpy), plus rapide que la
+        DMatrix pour les petits calendriers et les re-prévisions journée par journée.
+        chemin_modele / chemin_metadata permettent de charger un autre booster (benchmarks).
+        verbeux=False coupe les print et la barre tqdm (traitements batch) ; les temps par
+        phase restent disponibles dans self.metriques, hook(nom, temps_mur, temps_cpu, metriques)
+        est appelé à la fin de chaque phase.
+        """
+        if predicteur not in ('xgboost', 'numpy'):
+            raise ValueError(f"Prédicteur inconnu: {predicteur}")
+        self.predicteur = predicteur
+        self.chemin_modele = chemin_modele
+        self.chemin_metadata = chemin_metadata
+        self.verbeux = verbeux
+        self.metriques = MetriquesSimulation(hook=hook)
+        self.cache_probas = CacheProbabilites(taille_max=taille_cache, chemin_disque=chemin_cache)
+        self.ensemble = []
+        with self.metriques.phase('chargement_modele'):
+            self.charger_modele()
         self.resultats_simulations = {}
-        
+
+    def afficher(self, *args):
+        if self.verbeux:
+            print(*args)
+
     def charger_modele(self):
         try:
             self.modele = xgb.Booster()
-            self.modele.load_model('modele_simulation_saison_complete/modele_xgboost_simulation.json')
-            self.metadata = joblib.load('modele_simulation_saison_complete/metadata.pkl')
+            self.modele.load_model(self.chemin_modele)
+            self.hash_modele = hash_fichier(self.chemin_modele)
+            self.arbres = ArbresNumpy.depuis_json(self.chemin_modele) if self.predicteur == 'numpy' else None
+            self.metadata = joblib.load(self.chemin_metadata)
             self.le = self.metadata['preprocessing']['label_encoder']
             self.features_attendues = self.metadata['preprocessing']['feature_names']
-            print(f" Modèle chargé - Accuracy: {self.metadata['performance']['accuracy_test_reference']:.4f}")
+            # Colonnes du booster remises dans l'ordre domicile : défaite, nul, victoire
+            classes = list(self.le.classes_)
+            self.ordre_domicile = [classes.index(c) for c in ('away_win', 'draw', 'home_win')]
+            self.afficher(f" Modèle chargé - Accuracy: {self.metadata['performance']['accuracy_test_reference']:.4f}")
         except Exception as e:
-            print(f" Erreur chargement modèle: {e}")
+            self.afficher(f" Erreur chargement modèle: {e}")
             raise
     
+    def charger_ensemble(self, chemins):
+        """
+        Charge K boosters entraînés comme modele_xgboost_simulation.json (bootstrap ou
+        graines différentes) pour les simulations avec incertitude du modèle (ensemble=True).
+        """
+        ensemble = []
+        for chemin in chemins:
+            booster = xgb.Booster()
+            booster.load_model(chemin)
+            if booster.feature_names is not None and booster.feature_names != self.features_attendues:
+                raise ValueError(f"Features du modèle {chemin} différentes de feature_names")
+            ensemble.append((booster, hash_fichier(chemin)))
+        self.ensemble = ensemble
+        self.afficher(f" Ensemble de {len(ensemble)} modèles chargé")
+
     def preparer_calendrier(self, df_saison):
         # S'assurer d'avoir les bonnes colonnes
         colonnes_manquantes = set(self.features_attendues) - set(df_saison.columns)
         if colonnes_manquantes:
-            print(f" Colonnes manquantes: {colonnes_manquantes}")
+            self.afficher(f" Colonnes manquantes: {colonnes_manquantes}")
         
         return df_saison[self.features_attendues].copy()
     
     
-    def predire_proba_tous_matchs(self, df_calendrier):
-        dcal = xgb.DMatrix(df_calendrier)
-        raw = self.modele.predict(dcal)  # shape (n, 3) 
+    def preparer_matrice(self, df_saison):
+        """Features en tableau float32 C-contigu dans l'ordre feature_names (une seule conversion)"""
+        with self.metriques.phase('preparation_features'):
+            return np.ascontiguousarray(df_saison[self.features_attendues].to_numpy(dtype=np.float32))
 
-        # Construire df_raw avec noms de colonnes du LabelEncoder
-        df_raw = pd.DataFrame(raw, columns=self.le.classes_)
+    def predire_proba_matrice(self, X, modele=None):
+        """
+        Chemin rapide : X (n, n_features) float32 C-contigu dans l'ordre feature_names,
+        prédiction en place du booster, renvoie un tableau (n, 3) défaite / nul / victoire
+        du domicile sans objet pandas intermédiaire.
+        modele : autre booster (membre d'ensemble) à la place du modèle principal.
+        """
+        self.metriques.lignes_predites += len(X)
+        with self.metriques.phase('booster'):
+            if modele is not None:
+                raw = modele.inplace_predict(X)
+            elif self.arbres is not None:
+                raw = self.arbres.predire(X)
+            else:
+                raw = self.modele.inplace_predict(X)  # shape (n, 3)
 
-        # Mapper vers le point de vue "domicile"
-        df = pd.DataFrame({
-            'proba_defaite': df_raw['away_win'].astype(float),
-            'proba_nul':     df_raw['draw'].astype(float),
-            'proba_victoire':df_raw['home_win'].astype(float),
-        })
+        probas = raw.astype(np.float64)[:, self.ordre_domicile]
 
         # clamp + renormalisation par ligne
-        df[df < 0] = 0.0
-        s = df.sum(axis=1).replace(0, 1.0)
-        df = df.div(s, axis=0)
+        np.maximum(probas, 0.0, out=probas)
+        s = probas.sum(axis=1, keepdims=True)
+        s[s == 0] = 1.0
+        probas /= s
+        return probas
+
+    def predire_brut(self, df_calendrier):
+        """Probabilités (n, 3) du booster, dans l'ordre défaite / nul / victoire du domicile"""
+        return self.predire_proba_matrice(self.preparer_matrice(df_calendrier))
+
+    def predire_proba_tous_matchs(self, df_calendrier):
+        """
+        Probabilités de chaque match ; seules les lignes absentes du cache passent par le booster.
+        df_calendrier peut aussi être la matrice de preparer_matrice.
+        """
+        if isinstance(df_calendrier, np.ndarray):
+            valeurs = df_calendrier
+            predire_lignes = lambda indices: self.predire_proba_matrice(df_calendrier[indices])
+        else:
+            valeurs = df_calendrier.to_numpy(dtype=np.float64)
+            predire_lignes = lambda indices: self.predire_brut(df_calendrier.iloc[indices])
+
+        misses_avant = self.cache_probas.misses
+        with self.metriques.phase('prediction'):
+            probas = self.cache_probas.predire(f"{self.hash_modele}:{self.predicteur}", valeurs, predire_lignes)
+        df = pd.DataFrame(probas, columns=COLONNES_PROBAS)
 
-        print(f" Probabilités calculées pour {len(df)} matchs")
+        n_predits = self.cache_probas.misses - misses_avant
+        self.metriques.lignes_cache += len(df) - n_predits
+        self.afficher(f" Probabilités calculées pour {len(df)} matchs ({len(df) - n_predits} depuis le cache)")
         return df
     
+    def predire_proba_ensemble(self, df_calendrier):
+        """
+        Probabilités (n_membres, n_matchs, 3) de chaque membre de l'ensemble : la matrice de
+        features est préparée une fois et chaque membre passe par le cache avec sa propre empreinte.
+        """
+        if not self.ensemble:
+            raise RuntimeError("Aucun ensemble chargé (charger_ensemble).")
+        X = df_calendrier if isinstance(df_calendrier, np.ndarray) else self.preparer_matrice(df_calendrier)
+
+        probas = np.empty((len(self.ensemble), len(X), 3))
+        with self.metriques.phase('prediction'):
+            for k, (booster, hash_membre) in enumerate(self.ensemble):
+                probas[k] = self.cache_probas.predire(
+                    f"{hash_membre}:xgboost", X,
+                    lambda indices: self.predire_proba_matrice(X[indices], modele=booster)
+                )
+        self.afficher(f" Probabilités calculées pour {len(X)} matchs avec {len(self.ensemble)} modèles")
+        return probas
+
+    def predire_calendrier(self, df_calendrier, ensemble=False):
+        """(df_probas, probas_ensemble) : df_probas est la moyenne de l'ensemble si ensemble=True"""
+        if not ensemble:
+            return self.predire_proba_tous_matchs(df_calendrier), None
+        probas_ensemble = self.predire_proba_ensemble(df_calendrier)
+        return pd.DataFrame(probas_ensemble.mean(axis=0), columns=COLONNES_PROBAS), probas_ensemble
+
     def simuler_un_match(self, probas):
         return np.random.choice(['Défaite', 'Nul', 'Victoire'], p=probas)
     
@@ -98,85 +292,600 @@ class MonteCarloSimulator:
         return dict(points), historique_matchs
 
 
+    def indexer_equipes(self, n_matchs, teams_home=None, teams_away=None):
+        """Associe chaque équipe à un index int32 (ordre de première apparition)"""
+        if teams_home is not None and len(teams_home) != n_matchs:
+            raise ValueError("teams_home n'a pas la même longueur que df_probas")
+        if teams_away is not None and len(teams_away) != n_matchs:
+            raise ValueError("teams_away n'a pas la même longueur que df_probas")
+        home = list(teams_home) if teams_home is not None else [f"Team_Home_{i}" for i in range(n_matchs)]
+        away = list(teams_away) if teams_away is not None else [f"Team_Away_{i}" for i in range(n_matchs)]
+
+        codes, equipes = pd.factorize(np.array([home, away], dtype=object).T.ravel())
+        codes = codes.astype(np.int32)
+        return list(equipes), codes[0::2], codes[1::2]
+
+    def calculer_seuils(self, df_probas):
+        """
+        Seuils cumulés (n_matchs x 3), calculés comme np.random.choice.
+        Accepte aussi les probabilités d'un ensemble (n_membres, n_matchs, 3).
+        """
+        if isinstance(df_probas, pd.DataFrame):
+            probas = df_probas[COLONNES_PROBAS].to_numpy(dtype=float)
+        else:
+            probas = np.asarray(df_probas, dtype=float)
+        cdf = probas.cumsum(axis=-1)
+        cdf /= cdf[..., -1:]
+        return cdf
+
+    def simuler_bloc_saisons(self, cdf, idx_domicile, idx_exterieur, n_equipes, n_simulations,
+                             points_initiaux=None):
+        """Simule un bloc de saisons avec le générateur global (np.random.seed)"""
+        return tirer_points(cdf, idx_domicile, idx_exterieur, n_equipes, n_simulations, np.random, points_initiaux)
+
+    def iterer_blocs(self, cdf, idx_domicile, idx_exterieur, n_equipes, n_simulations,
+                     taille_bloc, seed=None, n_workers=None, max_points=None, points_initiaux=None):
+        """
+        Génère (début, bloc) dans l'ordre des simulations.
+        Sans n_workers, les blocs sont tirés avec le générateur global.
+        Avec n_workers, chaque bloc est un shard doté de son Generator issu de
+        SeedSequence(seed).spawn : le découpage ne dépend que de taille_bloc, donc
+        le résultat est identique quel que soit le nombre de workers.
+        Si max_points est fourni, chaque shard renvoie son AccumulateurSimulations.
+        """
+        debuts = range(0, n_simulations, taille_bloc)
+        tailles = [min(taille_bloc, n_simulations - debut) for debut in debuts]
+
+        if n_workers is None:
+            for debut, n_bloc in zip(debuts, tailles):
+                with self.metriques.phase('tirage'):
+                    bloc = self.simuler_bloc_saisons(
+                        cdf, idx_domicile, idx_exterieur, n_equipes, n_bloc, points_initiaux
+                    )
+                yield debut, bloc
+            return
+
+        graines = np.random.SeedSequence(seed).spawn(len(tailles))
+        shard = partial(
+            simuler_shard, cdf, idx_domicile, idx_exterieur, n_equipes,
+            max_points=max_points, points_initiaux=points_initiaux
+        )
+        if n_workers == 1:
+            for debut, n_bloc, graine in zip(debuts, tailles, graines):
+                with self.metriques.phase('tirage'):
+                    bloc = shard(n_bloc, graine)
+                yield debut, bloc
+            return
+
+        # Fenêtre bornée de shards en cours : un arrêt anticipé n'attend pas tout le calendrier
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            en_cours = deque()
+            try:
+                for debut, n_bloc, graine in zip(debuts, tailles, graines):
+                    en_cours.append((debut, executor.submit(shard, n_bloc, graine)))
+                    if len(en_cours) >= 2 * n_workers:
+                        debut_pret, futur = en_cours.popleft()
+                        with self.metriques.phase('tirage'):
+                            bloc = futur.result()
+                        yield debut_pret, bloc
+                while en_cours:
+                    debut_pret, futur = en_cours.popleft()
+                    with self.metriques.phase('tirage'):
+                        bloc = futur.result()
+                    yield debut_pret, bloc
+            finally:
+                for _, futur in en_cours:
+                    futur.cancel()
+
     def simuler_saison_complete(
         self,
         df_calendrier_features,
         teams_home=None,
         teams_away=None,
         n_simulations=1000,
-        seed=None
+        seed=None,
+        moteur='vectorise',
+        taille_bloc=5000,
+        streaming=False,
+        n_workers=None,
+        tolerance=None,
+        tolerance_points=None,
+        ensemble=False
     ):
-       
-        import numpy as np
-        from collections import defaultdict
-        from tqdm import tqdm
+        """
+        moteur='vectorise' tire toutes les saisons d'un bloc en une fois,
+        moteur='iteratif' rejoue match par match (même résultat pour une même seed).
+        streaming=True ne conserve pas les points de chaque simulation : chaque bloc
+        met à jour des agrégats de taille fixe (histogrammes, positions, Welford).
+        n_workers répartit les blocs sur un pool de process, avec une graine par bloc
+        (résultats identiques pour une seed donnée quel que soit n_workers).
+        tolerance (et/ou tolerance_points) active l'arrêt adaptatif : les blocs s'enchaînent
+        jusqu'à ce que l'erreur standard Monte Carlo des probabilités de titre, top 4 et
+        relégation (resp. des points moyens) passe sous la tolérance, au plus tôt après
+        BLOCS_MIN_ADAPTATIF blocs ; n_simulations devient alors un plafond.
+        ensemble=True utilise les modèles de charger_ensemble : chaque simulation tire un
+        membre, ce qui propage l'incertitude du modèle dans les intervalles ; df_probas
+        renvoyé est alors la moyenne de l'ensemble.
+        """
+        self.afficher(f" Lancement de {n_simulations} simulations Monte Carlo...")
+
+        # 1) Probas sur les FEATURES (pas sur predire_proba_tous_matchsdf_saison brut)
+        df_probas, probas_ensemble = self.predire_calendrier(df_calendrier_features, ensemble)
+        self.afficher(df_probas)
+        equipes, idx_domicile, idx_exterieur = self.indexer_equipes(len(df_probas), teams_home, teams_away)
+
+        analyse = self.lancer_simulations(
+            df_probas, equipes, idx_domicile, idx_exterieur, n_simulations,
+            seed=seed, moteur=moteur, taille_bloc=taille_bloc, streaming=streaming,
+            n_workers=n_workers, tolerance=tolerance, tolerance_points=tolerance_points,
+            probas_ensemble=probas_ensemble
+        )
+        return analyse, df_probas
+
+    def simuler_calendriers(self, calendriers, n_simulations=1000, seed=None, taille_bloc=5000):
+        """
+        Simule plusieurs calendriers (saisons, ligues, scénarios) en une passe :
+        calendriers est une liste de (df_calendrier_features, teams_home, teams_away).
+        Toutes les lignes sont prédites en un seul appel au booster puis les saisons sont
+        tirées dans un tenseur (calendriers x simulations x matchs) complété par une équipe puits.
+        Renvoie (analyses, probas) : une analyse par calendrier, au format de analyser_resultats.
+        """
+        self.afficher(f" Lancement de {n_simulations} simulations sur {len(calendriers)} calendriers...")
+
+        matrices = [self.preparer_matrice(df_features) for df_features, _, _ in calendriers]
+        probas = self.predire_proba_tous_matchs(np.concatenate(matrices))
+        debuts = np.cumsum([0] + [len(matrice) for matrice in matrices])
+        liste_probas = [
+            probas.iloc[debut:fin].reset_index(drop=True) for debut, fin in zip(debuts[:-1], debuts[1:])
+        ]
+
+        index = [
+            self.indexer_equipes(len(df_probas), teams_home, teams_away)
+            for df_probas, (_, teams_home, teams_away) in zip(liste_probas, calendriers)
+        ]
+        n_matchs = max(len(df_probas) for df_probas in liste_probas)
+        n_equipes = max(len(equipes) for equipes, _, _ in index)
+
+        # Bourrage : seuils à 1 (tirage quelconque) et matchs de l'équipe puits n_equipes
+        cdf = np.ones((len(calendriers), n_matchs, 3))
+        idx_domicile = np.full((len(calendriers), n_matchs), n_equipes, dtype=np.int32)
+        idx_exterieur = idx_domicile.copy()
+        for c, (df_probas, (_, dom, ext)) in enumerate(zip(liste_probas, index)):
+            cdf[c, :len(df_probas)] = self.calculer_seuils(df_probas)
+            idx_domicile[c, :len(dom)] = dom
+            idx_exterieur[c, :len(ext)] = ext
 
         if seed is not None:
             np.random.seed(seed)
 
-        print(f" Lancement de {n_simulations} simulations Monte Carlo...")
+        points = np.zeros((len(calendriers), n_simulations, n_equipes), dtype=np.int16)
+        debuts = range(0, n_simulations, taille_bloc)
+        for debut in tqdm(debuts, desc="Simulations", disable=not self.verbeux):
+            n_bloc = min(taille_bloc, n_simulations - debut)
+            with self.metriques.phase('tirage'):
+                points[:, debut:debut + n_bloc] = tirer_points_calendriers(
+                    cdf, idx_domicile, idx_exterieur, n_equipes, n_bloc, np.random
+                )
+        self.metriques.n_simulations += n_simulations * len(calendriers)
 
-        # 1) Probas sur les FEATURES (pas sur predire_proba_tous_matchsdf_saison brut)
-        df_probas = self.predire_proba_tous_matchs(df_calendrier_features)
-        print(df_probas)
-        # 2) Résultats
-        tous_classements = []
-        points_par_equipe = defaultdict(list)
+        analyses = [
+            self.analyser_resultats(points[c, :, :len(equipes)], equipes)
+            for c, (equipes, _, _) in enumerate(index)
+        ]
+        return analyses, liste_probas
+
+    def lancer_simulations(
+        self,
+        df_probas,
+        equipes,
+        idx_domicile,
+        idx_exterieur,
+        n_simulations=1000,
+        seed=None,
+        moteur='vectorise',
+        taille_bloc=5000,
+        streaming=False,
+        n_workers=None,
+        tolerance=None,
+        tolerance_points=None,
+        points_initiaux=None,
+        probas_ensemble=None
+    ):
+        """
+        Simule les matchs de df_probas, analyse et range les résultats dans resultats_simulations.
+        probas_ensemble (n_membres, n_matchs, 3) remplace df_probas pour le tirage.
+        """
+        if moteur not in ('vectorise', 'iteratif'):
+            raise ValueError(f"Moteur inconnu: {moteur}")
+        if streaming and moteur != 'vectorise':
+            raise ValueError("Le mode streaming nécessite moteur='vectorise'")
+        if n_workers is not None and moteur != 'vectorise':
+            raise ValueError("n_workers nécessite moteur='vectorise'")
+        adaptatif = tolerance is not None or tolerance_points is not None
+        if adaptatif and moteur != 'vectorise':
+            raise ValueError("L'arrêt adaptatif nécessite moteur='vectorise'")
+        if probas_ensemble is not None and moteur != 'vectorise':
+            raise ValueError("Un ensemble de modèles nécessite moteur='vectorise'")
+
+        if seed is not None and n_workers is None:
+            np.random.seed(seed)
+
+        # 2) Résultats : une ligne par simulation, une colonne par équipe
+        points = None if streaming else np.zeros((n_simulations, len(equipes)), dtype=np.int16)
+        accumulateur = None
+        if streaming or adaptatif:
+            matchs_par_equipe = np.bincount(np.concatenate([idx_domicile, idx_exterieur]), minlength=len(equipes))
+            max_points = 3 * int(matchs_par_equipe.max())
+            if points_initiaux is not None:
+                max_points += int(points_initiaux.max())
+            accumulateur = AccumulateurSimulations(len(equipes), max_points)
 
         # 3) Simulations
-        for _ in tqdm(range(n_simulations), desc="Simulations"):
-            points_saison, _ = self.simuler_une_saison(df_probas, teams_home, teams_away)
-            tous_classements.append(points_saison)
-            for equipe, pts in points_saison.items():
-                points_par_equipe[equipe].append(pts)
+        if moteur == 'iteratif':
+            index_equipe = {equipe: j for j, equipe in enumerate(equipes)}
+            teams_home = [equipes[i] for i in idx_domicile]
+            teams_away = [equipes[i] for i in idx_exterieur]
+            with self.metriques.phase('tirage'):
+                for i in tqdm(range(n_simulations), desc="Simulations", disable=not self.verbeux):
+                    points_saison, _ = self.simuler_une_saison(df_probas, teams_home, teams_away)
+                    for equipe, pts in points_saison.items():
+                        points[i, index_equipe[equipe]] = pts
+                if points_initiaux is not None:
+                    points += points_initiaux
+        else:
+            cdf = self.calculer_seuils(df_probas if probas_ensemble is None else probas_ensemble)
+            blocs = self.iterer_blocs(
+                cdf, idx_domicile, idx_exterieur, len(equipes), n_simulations,
+                taille_bloc, seed=seed, n_workers=n_workers,
+                max_points=accumulateur.max_points if streaming and n_workers is not None else None,
+                points_initiaux=points_initiaux
+            )
+            n_blocs = -(-n_simulations // taille_bloc)
+            n_effectuees = 0
+            for i_bloc, (debut, bloc) in enumerate(tqdm(blocs, total=n_blocs, desc="Simulations", disable=not self.verbeux)):
+                with self.metriques.phase('agregation'):
+                    if isinstance(bloc, AccumulateurSimulations):
+                        accumulateur.fusionner(bloc)
+                        n_effectuees += bloc.n_simulations
+                    else:
+                        if accumulateur is not None:
+                            accumulateur.ajouter_bloc(bloc)
+                        if points is not None:
+                            points[debut:debut + len(bloc)] = bloc
+                        n_effectuees += len(bloc)
+
+                if (adaptatif and i_bloc + 1 >= BLOCS_MIN_ADAPTATIF
+                        and self.precision_atteinte(accumulateur, tolerance, tolerance_points)):
+                    break
+            blocs.close()
+
+            if n_effectuees < n_simulations:
+                self.afficher(f" Précision atteinte après {n_effectuees} simulations")
+                n_simulations = n_effectuees
+                if points is not None:
+                    points = points[:n_effectuees]
 
         # 4) Analyse
-        analyse = self.analyser_resultats(points_par_equipe)
+        if streaming:
+            with self.metriques.phase('analyse'):
+                analyse = accumulateur.analyser(equipes)
+            relatives = accumulateur.probabilites_relatives(equipes)
+        else:
+            analyse, relatives = self.analyser_avec_relatives(points, equipes)
+        self.metriques.n_simulations += n_simulations
+
+        self.resultats_simulations = {
+            'analyse': analyse,
+            'probabilites_relatives': relatives,
+            'probabilites_matchs': df_probas,
+            'points': points,
+            'equipes': equipes,
+            'accumulateur': accumulateur,
+            'n_simulations': n_simulations,
+            'seed': seed
+        }
+        return analyse
+
+    def sauvegarder_simulations(self, dossier):
+        """Écrit les résultats de la dernière simulation (points en .npy, agrégats, métadonnées)"""
+        if not self.resultats_simulations:
+            raise RuntimeError("Aucune simulation à sauvegarder.")
+        sauvegarder_resultats(dossier, self.resultats_simulations, {
+            'hash_modele': self.hash_modele,
+            'predicteur': self.predicteur,
+            'seed': self.resultats_simulations.get('seed'),
+        })
+        self.afficher(f" Résultats sauvegardés dans {dossier}")
+
+    def charger_simulations(self, dossier):
+        """
+        Rattache un run sauvegardé : la matrice des points reste sur disque (memory-map),
+        rapports et comparaisons utilisent directement les agrégats.
+        """
+        self.resultats_simulations, meta = charger_resultats(dossier)
+        if meta.get('hash_modele') != self.hash_modele:
+            self.afficher(" Attention : résultats produits avec une autre version du modèle")
+        self.afficher(f" {meta['n_simulations']} simulations rechargées depuis {dossier}")
+        return self.resultats_simulations['analyse']
+
+    def simuler_forme_dynamique(
+        self,
+        df_calendrier_features,
+        teams_home,
+        teams_away,
+        dates,
+        n_simulations=1000,
+        seed=None,
+        taille_bloc=5000
+    ):
+        """
+        Simulation avec forme dynamique : les matchs sont regroupés par date en journées et,
+        avant chaque journée, points_home / points_away sont remplacés dans chaque simulation
+        par la projection (1 - matchs_joues / matchs_total) * valeur_initiale + points_actuels,
+        puis la journée est re-prédite pour toutes les simulations en une seule matrice.
+        Une ligne ne dépend que de (match, points domicile, points extérieur) : chaque état
+        distinct n'est prédit qu'une fois pour tout le run (cache par clé entière, plus léger
+        que l'empreinte de ligne de cache_probas pour des centaines de milliers d'états).
+        Renvoie (analyse, df_probas) où df_probas est la moyenne des probabilités de chaque
+        match sur les simulations.
+        """
+        if len(dates) != len(df_calendrier_features):
+            raise ValueError("dates n'a pas la même longueur que df_calendrier_features")
+        self.afficher(f" Lancement de {n_simulations} simulations avec forme dynamique...")
+
+        X = self.preparer_matrice(df_calendrier_features)
+        colonnes_forme = [self.features_attendues.index(nom) for nom in FEATURES_FORME]
+        equipes, idx_domicile, idx_exterieur = self.indexer_equipes(len(X), teams_home, teams_away)
+        n_equipes = len(equipes)
+
+        # Journées dans l'ordre chronologique, matchs déjà joués par équipe avant chacune
+        jours, journees = np.unique(pd.to_datetime(pd.Series(dates)).to_numpy(), return_inverse=True)
+        matchs_total = np.bincount(np.concatenate([idx_domicile, idx_exterieur]), minlength=n_equipes)
+        matchs_journees = [np.flatnonzero(journees == j) for j in range(len(jours))]
+        largeur = 3 * int(matchs_total.max()) + 1
+        cles_connues = np.empty(0, dtype=np.int64)
+        probas_connues = np.empty((0, 3))
+
+        if seed is not None:
+            np.random.seed(seed)
+
+        points = np.zeros((n_simulations, n_equipes), dtype=np.int16)
+        somme_probas = np.zeros((len(X), 3))
+        for debut in tqdm(range(0, n_simulations, taille_bloc), desc="Simulations", disable=not self.verbeux):
+            n_bloc = min(taille_bloc, n_simulations - debut)
+            points_bloc = np.zeros((n_bloc, n_equipes), dtype=np.int16)
+            matchs_joues = np.zeros(n_equipes)
+
+            for matchs in matchs_journees:
+                dom, ext = idx_domicile[matchs], idx_exterieur[matchs]
+
+                with self.metriques.phase('forme'):
+                    # Clé entière (match, points domicile, points extérieur) de chaque ligne
+                    cles = (matchs.astype(np.int64) * largeur + points_bloc[:, dom]) * largeur + points_bloc[:, ext]
+                    uniques, inverse = np.unique(cles, return_inverse=True)
+                    position = np.searchsorted(cles_connues, uniques).clip(max=len(cles_connues) - 1)
+                    nouvelles = uniques[cles_connues[position] != uniques] if len(cles_connues) else uniques
+
+                    match, reste = np.divmod(nouvelles, largeur * largeur)
+                    lignes = X[match]
+                    for colonne, equipe, pts in zip(colonnes_forme, (idx_domicile[match], idx_exterieur[match]),
+                                                    np.divmod(reste, largeur)):
+                        restant = 1 - matchs_joues[equipe] / matchs_total[equipe]
+                        lignes[:, colonne] = restant * lignes[:, colonne] + pts
+
+                with self.metriques.phase('prediction'):
+                    if len(nouvelles):
+                        # nouvelles est trié : insertion directe, les clés connues restent triées
+                        insertion = np.searchsorted(cles_connues, nouvelles)
+                        cles_connues = np.insert(cles_connues, insertion, nouvelles)
+                        probas_connues = np.insert(probas_connues, insertion, self.predire_proba_matrice(lignes), axis=0)
+                    probas = probas_connues[np.searchsorted(cles_connues, uniques)]
+                    probas = probas[inverse.reshape(-1)].reshape(n_bloc, len(matchs), 3)
+                self.metriques.lignes_cache += len(cles.ravel()) - len(nouvelles)
 
+                with self.metriques.phase('tirage'):
+                    cdf = self.calculer_seuils(probas)
+                    u = np.random.random((n_bloc, len(matchs)))
+                    resultats = (u >= cdf[:, :, 0]).astype(np.int8) + (u >= cdf[:, :, 1])
+                    lignes_bloc = np.arange(n_bloc)[:, None]
+                    np.add.at(points_bloc, (lignes_bloc, dom), POINTS_DOMICILE[resultats].astype(np.int16))
+                    np.add.at(points_bloc, (lignes_bloc, ext), POINTS_EXTERIEUR[resultats].astype(np.int16))
+
+                somme_probas[matchs] += probas.sum(axis=0)
+                np.add.at(matchs_joues, dom, 1)
+                np.add.at(matchs_joues, ext, 1)
+
+            points[debut:debut + n_bloc] = points_bloc
+        self.metriques.n_simulations += n_simulations
+
+        df_probas = pd.DataFrame(somme_probas / n_simulations, columns=COLONNES_PROBAS)
+        analyse, relatives = self.analyser_avec_relatives(points, equipes)
         self.resultats_simulations = {
             'analyse': analyse,
+            'probabilites_relatives': relatives,
             'probabilites_matchs': df_probas,
-            'points_par_equipe': points_par_equipe,
-            'tous_classements': tous_classements
+            'points': points,
+            'equipes': equipes,
+            'accumulateur': None,
+            'n_simulations': n_simulations,
+            'seed': seed
         }
         return analyse, df_probas
 
-    
-    def analyser_resultats(self, points_par_equipe):
-        """Analyse statistique des résultats des simulations"""
+    def analyser_exact(self, df_calendrier_features, teams_home=None, teams_away=None, points_initiaux=None):
+        """
+        Loi exacte des points de chaque équipe par convolution des lois par match, sans tirage.
+        Même format que analyser_resultats (plus 'pmf' : P(total = k) pour k = 0..max) ;
+        les probabilités de classement dépendent de la loi jointe et restent du ressort des simulations.
+        points_initiaux : dict {equipe: points} déjà acquis (saison entamée).
+        """
+        df_probas = self.predire_proba_tous_matchs(df_calendrier_features)
+        equipes, idx_domicile, idx_exterieur = self.indexer_equipes(len(df_probas), teams_home, teams_away)
+        depart = None
+        if points_initiaux is not None:
+            depart = np.array([points_initiaux.get(equipe, 0) for equipe in equipes], dtype=np.int64)
+
+        with self.metriques.phase('convolution'):
+            pmf = distributions_exactes(df_probas, idx_domicile, idx_exterieur, len(equipes), depart)
+            return analyser_distributions(pmf, equipes)
+
+    def simuler_suite_saison(
+        self,
+        df_resultats_joues,
+        df_calendrier_restant,
+        teams_home,
+        teams_away,
+        n_simulations=1000,
+        seed=None,
+        ensemble=False,
+        **options
+    ):
+        """
+        Re-prévision en cours de saison : part du classement actuel (df_resultats_joues,
+        colonnes home_team / away_team / result) et ne simule que les matchs restants.
+        Les probabilités des matchs restants déjà prédits sont reprises du cache (cache_probas).
+        options : mêmes paramètres de simulation que simuler_saison_complete.
+        """
+        points_actuels = self.simuler_saison_reel(df_resultats_joues)
+
+        self.afficher(f" Lancement de {n_simulations} simulations sur {len(df_calendrier_restant)} matchs restants...")
+        df_probas, probas_ensemble = self.predire_calendrier(df_calendrier_restant, ensemble)
+
+        equipes, idx_domicile, idx_exterieur = self.indexer_equipes(len(df_probas), teams_home, teams_away)
+        equipes = [str(equipe) for equipe in equipes]
+        # Équipes sans match restant : elles gardent leurs points actuels
+        equipes += [equipe for equipe in points_actuels if equipe not in equipes]
+        points_initiaux = np.array([points_actuels.get(equipe, 0) for equipe in equipes], dtype=np.int16)
+
+        analyse = self.lancer_simulations(
+            df_probas, equipes, idx_domicile, idx_exterieur, n_simulations,
+            seed=seed, points_initiaux=points_initiaux, probas_ensemble=probas_ensemble, **options
+        )
+        return analyse, df_probas
+
+    def precision_atteinte(self, accumulateur, tolerance=None, tolerance_points=None):
+        """Vrai si toutes les erreurs standard suivies sont sous leur tolérance"""
+        erreurs = accumulateur.erreurs_standard()
+        if tolerance is not None:
+            for cle in ('titre', 'top4', 'relegation'):
+                if erreurs[cle].max() > tolerance:
+                    return False
+        if tolerance_points is not None and erreurs['moyenne_points'].max() > tolerance_points:
+            return False
+        return True
+
+    def distribution_points(self, equipe):
+        """(valeurs, effectifs) des points simulés d'une équipe, avec ou sans streaming"""
+        j = self.resultats_simulations['equipes'].index(equipe)
+        if self.resultats_simulations['accumulateur'] is not None:
+            return self.resultats_simulations['accumulateur'].distribution_points(j)
+        comptes = np.bincount(self.resultats_simulations['points'][:, j])
+        valeurs = np.flatnonzero(comptes)
+        return valeurs, comptes[valeurs]
+
+    def analyser_resultats(self, points, equipes, comptes_positions=None):
+        """
+        Analyse statistique des résultats des simulations (matrice n_simulations x n_equipes).
+        Les points étant de petits entiers, toutes les statistiques sont tirées d'un seul
+        histogramme 2D (un passage sur la matrice, quantiles exacts comme np.percentile).
+        comptes_positions évite de reclasser les simulations s'ils sont déjà calculés.
+        """
         analyse = {}
         
-        for equipe, points_list in points_par_equipe.items():
-            points_array = np.array(points_list)
-            
-            analyse[equipe] = {
-                'moyenne_points': float(np.mean(points_array)),
-                'mediane_points': float(np.median(points_array)),
-                'ecart_type': float(np.std(points_array)),
-                'min_points': int(np.min(points_array)),
-                'max_points': int(np.max(points_array)),
-                'intervalle_confiance_95': [
-                    float(np.percentile(points_array, 2.5)),
-                    float(np.percentile(points_array, 97.5))
-                ]
-            }
-        
-        df_simulations = pd.DataFrame(points_par_equipe)
-        analyse['probabilites_classement'] = self.calculer_probabilites_classement(df_simulations)
+        with self.metriques.phase('analyse'):
+            histogramme = compter_histogramme(points)
+            for j, equipe in enumerate(equipes):
+                analyse[equipe] = statistiques_histogramme(histogramme[j])
+
+        with self.metriques.phase('classement'):
+            if comptes_positions is None:
+                comptes_positions = self.calculer_comptes_positions(points)
+            analyse['probabilites_classement'] = probabilites_depuis_comptes(comptes_positions, len(points), equipes)
         
         return analyse
+
+    def analyser_avec_relatives(self, points, equipes):
+        """analyser_resultats et calculer_probabilites_relatives sur un seul classement des simulations"""
+        with self.metriques.phase('classement'):
+            comptes_positions, comptes_titre_relegation = self.calculer_comptes_classement(points)
+        analyse = self.analyser_resultats(points, equipes, comptes_positions)
+        relatives = self.calculer_probabilites_relatives(points, equipes, comptes_titre_relegation)
+        return analyse, relatives
     
-    def calculer_probabilites_classement(self, df_simulations):
-        n_simulations = len(df_simulations)
-        classements = df_simulations.rank(axis=1, ascending=False, method='min')
-        
-        probabilites = {}
-        for equipe in df_simulations.columns:
-            pos_counts = classements[equipe].value_counts().sort_index()
-            probabilites[equipe] = {pos: count/n_simulations for pos, count in pos_counts.items()}
-        
-        return probabilites
+    def calculer_comptes_classement(self, points, taille_bloc=100_000, titre_relegation=True):
+        """
+        Un passage de calculer_rangs par bloc pour deux comptages : matrice (n_equipes x n_positions)
+        du nombre de simulations par position finale et, si titre_relegation, matrice
+        (n_equipes x n_equipes) des simulations où A est champion et B relégué (sinon None).
+        """
+        n_equipes = points.shape[1]
+        comptes = np.zeros(n_equipes * n_equipes, dtype=np.int64)
+        comptes_titre_relegation = np.zeros((n_equipes, n_equipes), dtype=np.int64) if titre_relegation else None
+        decalage = np.arange(n_equipes) * n_equipes - 1
+
+        for debut in range(0, len(points), taille_bloc):
+            rangs = calculer_rangs(np.asarray(points[debut:debut + taille_bloc]))
+            comptes += np.bincount((rangs + decalage).ravel(), minlength=n_equipes * n_equipes)
+            if titre_relegation:
+                comptes_titre_relegation += compter_titre_relegation(rangs)
+
+        return comptes.reshape(n_equipes, n_equipes), comptes_titre_relegation
+
+    def calculer_comptes_positions(self, points, taille_bloc=100_000):
+        """Matrice (n_equipes x n_positions) du nombre de simulations par position finale"""
+        return self.calculer_comptes_classement(points, taille_bloc, titre_relegation=False)[0]
+
+    def calculer_probabilites_classement(self, points, equipes):
+        comptes = self.calculer_comptes_positions(points)
+        return probabilites_depuis_comptes(comptes, len(points), equipes)
     
+    def calculer_probabilites_relatives(self, points, equipes, comptes_titre_relegation=None, taille_bloc=100_000):
+        """
+        P(A devant B) et P(A champion et B relégué) sur la matrice des points, par blocs.
+        comptes_titre_relegation (calculer_comptes_classement) évite de reclasser les simulations.
+        """
+        n_equipes = points.shape[1]
+        comptes_devant = np.zeros((n_equipes, n_equipes), dtype=np.int64)
+        a_classer = comptes_titre_relegation is None
+        if a_classer:
+            comptes_titre_relegation = np.zeros((n_equipes, n_equipes), dtype=np.int64)
+
+        with self.metriques.phase('classement'):
+            for debut in range(0, len(points), taille_bloc):
+                bloc = np.asarray(points[debut:debut + taille_bloc])
+                comptes_devant += compter_devant(bloc)
+                if a_classer:
+                    comptes_titre_relegation += compter_titre_relegation(calculer_rangs(bloc))
+
+        return probabilites_relatives(comptes_devant, comptes_titre_relegation, len(points), equipes)
+
+    def probabilite_devant(self, equipe_a, equipe_b):
+        """P(equipe_a termine avec strictement plus de points que equipe_b)"""
+        return float(self.resultats_simulations['probabilites_relatives']['devant'].loc[equipe_a, equipe_b])
+
+    def probabilite_conjointe(self, equipe_a, positions_a, equipe_b, positions_b, taille_bloc=100_000):
+        """
+        P(equipe_a finit dans positions_a et equipe_b dans positions_b), positions à partir de 1
+        (ex. [1] et range(18, 21) : A champion et B relégué). Nécessite la matrice des points,
+        sauf pour le couple titre / relégation conservé dans les agrégats.
+        """
+        points = self.resultats_simulations['points']
+        equipes = self.resultats_simulations['equipes']
+        positions_a, positions_b = list(positions_a), list(positions_b)
+
+        if points is None:
+            relegation = list(range(len(equipes) - N_RELEGUES + 1, len(equipes) + 1))
+            if positions_a == [1] and positions_b == relegation:
+                return float(self.resultats_simulations['probabilites_relatives']['titre_et_relegation'].loc[equipe_a, equipe_b])
+            raise RuntimeError("Requête conjointe impossible sans la matrice des points (streaming=False).")
+
+        ja, jb = equipes.index(equipe_a), equipes.index(equipe_b)
+        n_conjoints = 0
+        for debut in range(0, len(points), taille_bloc):
+            rangs = calculer_rangs(np.asarray(points[debut:debut + taille_bloc]))
+            n_conjoints += int((np.isin(rangs[:, ja], positions_a) & np.isin(rangs[:, jb], positions_b)).sum())
+        return n_conjoints / len(points)
+
     def simuler_saison_reel(self, df_simulation_reel):
             # Vérifier les colonnes
         required = {'home_team', 'away_team', 'result'}
@@ -233,77 +942,58 @@ class MonteCarloSimulator:
         for equipe, proba in sorted(probas_titre.items(), key=lambda x: x[1], reverse=True)[:5]:
             if proba > 0:
                 print(f"   {equipe:20} {proba:6.2%}")
+
+        relatives = self.resultats_simulations.get('probabilites_relatives')
+        if relatives is None:
+            return
+
+        # P(ligne devant colonne) entre les 5 premières équipes du classement moyen
+        print("\ CONFRONTATIONS AU CLASSEMENT (P ligne devant colonne):")
+        tete = [equipe for equipe, _ in classement_moyen[:5]]
+        print(" " * 23 + "".join(f"{str(equipe)[:8]:>9}" for equipe in tete))
+        for a in tete:
+            valeurs = "".join(
+                f"{'-':>9}" if a == b else f"{relatives['devant'].loc[a, b]:9.1%}" for b in tete
+            )
+            print(f"   {str(a):20}{valeurs}")
+
+        print("\ CHAMPION ET RELÉGUÉ (couples les plus probables):")
+        conjoints = relatives['titre_et_relegation'].stack()
+        for (a, b), proba in conjoints[conjoints > 0].sort_values(ascending=False).head(5).items():
+            print(f"   {str(a):20} champion et {str(b):20} relégué {proba:6.2%}")
     
+    def agregats_rapport(self):
+        """Données d'un rapport, sans les simulations brutes : analyse et distribution des points par équipe"""
+        analyse = self.resultats_simulations['analyse']
+        return {
+            'analyse': analyse,
+            'distributions': {equipe: self.distribution_points(equipe) for equipe in self.resultats_simulations['equipes']},
+        }
+
     def visualiser_resultats(self):
         if not self.resultats_simulations:
             return
-        
-        analyse = self.resultats_simulations['analyse']
-        points_par_equipe = self.resultats_simulations['points_par_equipe']
-        
-        top_equipes = sorted(
-            [(equipe, stats['moyenne_points']) for equipe, stats in analyse.items() 
-             if equipe not in ['probabilites_classement']],
-            key=lambda x: x[1], 
-            reverse=True
-        )
-        
-        top_equipes_noms = [equipe for equipe, _ in top_equipes]
-        
+        import matplotlib.pyplot as plt
+
         fig, axes = plt.subplots(2, 2, figsize=(15, 12))
-        
-        # 1. Distribution des points pour le top 5
-        for i, equipe in enumerate(top_equipes_noms[:5]):
-            axes[0, 0].hist(points_par_equipe[equipe], bins=20, alpha=0.7, label=equipe)
-        axes[0, 0].set_title('Distribution des Points - Top 5 Équipes')
-        axes[0, 0].set_xlabel('Points')
-        axes[0, 0].set_ylabel('Fréquence')
-        axes[0, 0].legend()
-        
-        # 2. Moyenne de points avec intervalles de confiance
-        equipes_visu = top_equipes_noms[:8]
-        moyennes = [analyse[eq]['moyenne_points'] for eq in equipes_visu]
-        conf_intervals = [analyse[eq]['intervalle_confiance_95'] for eq in equipes_visu]
-        errors = [(moy - conf[0], conf[1] - moy) for moy, conf in zip(moyennes, conf_intervals)]
-        
-        y_pos = np.arange(len(equipes_visu))
-        axes[0, 1].barh(y_pos, moyennes, xerr=np.array(errors).T, alpha=0.7)
-        axes[0, 1].set_yticks(y_pos)
-        axes[0, 1].set_yticklabels(equipes_visu)
-        axes[0, 1].set_xlabel('Points Moyens')
-        axes[0, 1].set_title('Points Moyens avec Intervalle de Confiance 95%')
-        
-        # 3. Probabilités de podium
-        probas_podium = {}
-        for equipe in top_equipes_noms:
-            probs = analyse['probabilites_classement'][equipe]
-            probas_podium[equipe] = sum(prob for pos, prob in probs.items() if pos <= 3)
-        
-        axes[1, 0].barh(range(len(probas_podium)), list(probas_podium.values()))
-        axes[1, 0].set_yticks(range(len(probas_podium)))
-        axes[1, 0].set_yticklabels(list(probas_podium.keys()))
-        axes[1, 0].set_xlabel('Probabilité Podium')
-        axes[1, 0].set_title('Probabilité de Finir sur le Podium')
-        
-        # 4. Heatmap des probabilités de classement
-        probas_classement = []
-        for equipe in top_equipes_noms[:6]:
-            probs = analyse['probabilites_classement'][equipe]
-            ligne = [probs.get(i, 0) for i in range(1, 7)]
-            probas_classement.append(ligne)
-        
-        im = axes[1, 1].imshow(probas_classement, cmap='YlOrRd', aspect='auto')
-        axes[1, 1].set_xticks(range(6))
-        axes[1, 1].set_xticklabels(range(1, 7))
-        axes[1, 1].set_yticks(range(len(top_equipes_noms[:6])))
-        axes[1, 1].set_yticklabels(top_equipes_noms[:6])
-        axes[1, 1].set_xlabel('Position Classement')
-        axes[1, 1].set_ylabel('Équipe')
-        axes[1, 1].set_title('Probabilités de Classement')
+        im = dessiner_resultats(axes, self.agregats_rapport())
         plt.colorbar(im, ax=axes[1, 1])
-        
+
         plt.tight_layout()
         plt.show()
+
+    def exporter_rapport(self, dossier, formats=('png', 'svg'), dpi=100):
+        """
+        Rapport sans affichage (jobs batch) : figures écrites dans dossier au(x) format(s) demandé(s),
+        avec celles de comparer_reel_modele si une comparaison a été faite. Renvoie les chemins.
+        """
+        if not self.resultats_simulations:
+            raise RuntimeError("Aucune simulation trouvée. Lance simuler_saison_complete() avant.")
+        comparaison = getattr(self, 'comparaison_resultats', None)
+        return rendre_rapport(
+            self.agregats_rapport(), dossier, formats,
+            df_comp=comparaison['df_comp'] if comparaison else None, dpi=dpi
+        )
     
     def comparer_reel_modele(self, classement_reel):
         if not self.resultats_simulations:
@@ -312,10 +1002,12 @@ class MonteCarloSimulator:
         import pandas as pd
         from scipy.stats import spearmanr
 
-        points_par_equipe = self.resultats_simulations['points_par_equipe']
+        analyse = self.resultats_simulations['analyse']
 
         # Points moyens simulés
-        points_model_mean = {e: np.mean(pts) for e, pts in points_par_equipe.items()}
+        points_model_mean = {
+            e: stats['moyenne_points'] for e, stats in analyse.items() if e != 'probabilites_classement'
+        }
 
         equipes = sorted(set(points_model_mean.keys()) | set(classement_reel.keys()))
         df_comp = pd.DataFrame({
@@ -362,42 +1054,12 @@ class MonteCarloSimulator:
             raise RuntimeError("Lance comparer_reel_modele() avant d’appeler cette fonction.")
 
         import matplotlib.pyplot as plt
-        import numpy as np
 
         df_comp = self.comparaison_resultats['df_comp']
 
-        # Barres : points réels vs simulés
-        df_plot = df_comp.sort_values('points_reels', ascending=False)
-        x = np.arange(len(df_plot)); w = 0.4
-
-        plt.figure(figsize=(12,6))
-        plt.bar(x - w/2, df_plot['points_reels'], width=w, label='Réel')
-        plt.bar(x + w/2, df_plot['points_model_mean'], width=w, label='Modèle (moyenne)')
-        plt.xticks(x, df_plot['equipe'], rotation=60, ha='right')
-        plt.ylabel('Points')
-        plt.title('Points réels vs simulés (moyenne)')
-        plt.legend()
-        plt.tight_layout()
-        plt.show()
-
-        #  Scatter : corrél
-        plt.figure(figsize=(6,6))
-        plt.scatter(df_comp['points_reels'], df_comp['points_model_mean'])
-        m = float(np.nanmax(df_comp[['points_reels','points_model_mean']].values)) + 5
-        plt.plot([0,m],[0,m])
-        plt.xlabel('Points réels')
-        plt.ylabel('Points simulés (moyenne)')
-        plt.title('Corrélation points — réel vs modèle')
-        plt.tight_layout()
-        plt.show()
-
-        # Écarts de rang 
-        df_rank = df_comp.sort_values('diff_rank')
-        y = np.arange(len(df_rank))
-        plt.figure(figsize=(10,10))
-        plt.barh(y, df_rank['diff_rank'])
-        plt.yticks(y, df_rank['equipe'])
-        plt.xlabel('Différence de rang (modèle réel)')
-        plt.title('Écart de rang par équipe')
-        plt.tight_layout()
-        plt.show()
\ No newline at end of file
+        # Barres réel / modèle, corrélation des points, écarts de rang
+        for _, taille, dessiner in FIGURES_COMPARAISON:
+            fig, ax = plt.subplots(figsize=taille)
+            dessiner(ax, df_comp)
+            plt.tight_layout()
+            plt.show()
@@ -0,0 +1,163 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# matplotlib n'est importé qu'au moment de dessiner : les simulations batch n'en dépendent pas
+
+
+def classement_moyen(analyse):
+    """Équipes triées par points moyens décroissants"""
+    return sorted(
+        [equipe for equipe in analyse if equipe != 'probabilites_classement'],
+        key=lambda equipe: analyse[equipe]['moyenne_points'],
+        reverse=True
+    )
+
+
+def dessiner_resultats(axes, agregats):
+    """
+    Les 4 panneaux de visualiser_resultats sur une grille d'axes 2 x 2, à partir des agrégats
+    ({'analyse', 'distributions': {equipe: (valeurs, effectifs)}}) et non des simulations brutes.
+    Renvoie l'image de la heatmap (pour la colorbar).
+    """
+    analyse = agregats['analyse']
+    top_equipes_noms = classement_moyen(analyse)
+
+    # 1. Distribution des points pour le top 5
+    for equipe in top_equipes_noms[:5]:
+        valeurs, effectifs = agregats['distributions'][equipe]
+        axes[0, 0].hist(valeurs, weights=effectifs, bins=20, alpha=0.7, label=equipe)
+    axes[0, 0].set_title('Distribution des Points - Top 5 Équipes')
+    axes[0, 0].set_xlabel('Points')
+    axes[0, 0].set_ylabel('Fréquence')
+    axes[0, 0].legend()
+
+    # 2. Moyenne de points avec intervalles de confiance
+    equipes_visu = top_equipes_noms[:8]
+    moyennes = [analyse[eq]['moyenne_points'] for eq in equipes_visu]
+    conf_intervals = [analyse[eq]['intervalle_confiance_95'] for eq in equipes_visu]
+    errors = [(moy - conf[0], conf[1] - moy) for moy, conf in zip(moyennes, conf_intervals)]
+
+    y_pos = np.arange(len(equipes_visu))
+    axes[0, 1].barh(y_pos, moyennes, xerr=np.array(errors).T, alpha=0.7)
+    axes[0, 1].set_yticks(y_pos)
+    axes[0, 1].set_yticklabels(equipes_visu)
+    axes[0, 1].set_xlabel('Points Moyens')
+    axes[0, 1].set_title('Points Moyens avec Intervalle de Confiance 95%')
+
+    # 3. Probabilités de podium
+    probas_podium = {}
+    for equipe in top_equipes_noms:
+        probs = analyse['probabilites_classement'][equipe]
+        probas_podium[equipe] = sum(prob for pos, prob in probs.items() if pos <= 3)
+
+    axes[1, 0].barh(range(len(probas_podium)), list(probas_podium.values()))
+    axes[1, 0].set_yticks(range(len(probas_podium)))
+    axes[1, 0].set_yticklabels(list(probas_podium.keys()))
+    axes[1, 0].set_xlabel('Probabilité Podium')
+    axes[1, 0].set_title('Probabilité de Finir sur le Podium')
+
+    # 4. Heatmap des probabilités de classement
+    probas_classement = []
+    for equipe in top_equipes_noms[:6]:
+        probs = analyse['probabilites_classement'][equipe]
+        probas_classement.append([probs.get(i, 0) for i in range(1, 7)])
+
+    im = axes[1, 1].imshow(probas_classement, cmap='YlOrRd', aspect='auto')
+    axes[1, 1].set_xticks(range(6))
+    axes[1, 1].set_xticklabels(range(1, 7))
+    axes[1, 1].set_yticks(range(len(top_equipes_noms[:6])))
+    axes[1, 1].set_yticklabels(top_equipes_noms[:6])
+    axes[1, 1].set_xlabel('Position Classement')
+    axes[1, 1].set_ylabel('Équipe')
+    axes[1, 1].set_title('Probabilités de Classement')
+    return im
+
+
+def dessiner_points_reel_modele(ax, df_comp):
+    """Barres : points réels vs simulés"""
+    df_plot = df_comp.sort_values('points_reels', ascending=False)
+    x = np.arange(len(df_plot)); w = 0.4
+    ax.bar(x - w/2, df_plot['points_reels'], width=w, label='Réel')
+    ax.bar(x + w/2, df_plot['points_model_mean'], width=w, label='Modèle (moyenne)')
+    ax.set_xticks(x)
+    ax.set_xticklabels(df_plot['equipe'], rotation=60, ha='right')
+    ax.set_ylabel('Points')
+    ax.set_title('Points réels vs simulés (moyenne)')
+    ax.legend()
+
+
+def dessiner_correlation(ax, df_comp):
+    """Scatter : corrélation points réels / simulés"""
+    ax.scatter(df_comp['points_reels'], df_comp['points_model_mean'])
+    m = float(np.nanmax(df_comp[['points_reels', 'points_model_mean']].values)) + 5
+    ax.plot([0, m], [0, m])
+    ax.set_xlabel('Points réels')
+    ax.set_ylabel('Points simulés (moyenne)')
+    ax.set_title('Corrélation points — réel vs modèle')
+
+
+def dessiner_ecarts_rang(ax, df_comp):
+    """Écarts de rang par équipe"""
+    df_rank = df_comp.sort_values('diff_rank')
+    y = np.arange(len(df_rank))
+    ax.barh(y, df_rank['diff_rank'])
+    ax.set_yticks(y)
+    ax.set_yticklabels(df_rank['equipe'])
+    ax.set_xlabel('Différence de rang (modèle réel)')
+    ax.set_title('Écart de rang par équipe')
+
+
+# (nom de fichier, taille, fonction de dessin) des figures de comparaison modèle / réel
+FIGURES_COMPARAISON = [
+    ('points_reel_modele', (12, 6), dessiner_points_reel_modele),
+    ('correlation_points', (6, 6), dessiner_correlation),
+    ('ecarts_rang', (10, 10), dessiner_ecarts_rang),
+]
+
+
+def rendre_rapport(agregats, dossier, formats=('png',), df_comp=None, dpi=100):
+    """
+    Écrit les figures d'un rapport sans affichage : matplotlib.figure.Figure est dessinée
+    par le canvas Agg, sans pyplot ni backend interactif (utilisable dans un process worker).
+    df_comp (comparer_reel_modele) ajoute les figures de comparaison. Renvoie les chemins écrits.
+    """
+    from matplotlib.figure import Figure
+
+    os.makedirs(dossier, exist_ok=True)
+    figures = []
+
+    fig = Figure(figsize=(15, 12))
+    axes = fig.subplots(2, 2)
+    im = dessiner_resultats(axes, agregats)
+    fig.colorbar(im, ax=axes[1, 1])
+    figures.append(('resultats', fig))
+
+    if df_comp is not None:
+        for nom, taille, dessiner in FIGURES_COMPARAISON:
+            fig = Figure(figsize=taille)
+            dessiner(fig.subplots(), df_comp)
+            figures.append((nom, fig))
+
+    chemins = []
+    for nom, fig in figures:
+        fig.tight_layout()
+        for extension in formats:
+            chemin = os.path.join(dossier, f"{nom}.{extension}")
+            fig.savefig(chemin, dpi=dpi)
+            chemins.append(chemin)
+    return chemins
+
+
+def _rendre_tache(tache):
+    return rendre_rapport(**tache)
+
+
+def rendre_rapports(taches, n_workers=None):
+    """
+    Rend plusieurs rapports (saisons, scénarios) en parallèle dans des process workers.
+    taches : liste de dicts d'arguments de rendre_rapport (agregats, dossier, formats...).
+    """
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        return list(executor.map(_rendre_tache, taches))
@@ -0,0 +1,105 @@
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from scripts.agregation import AccumulateurSimulations
+
+# Contenu d'un dossier de résultats
+FICHIER_POINTS = 'points.npy'
+FICHIER_PROBAS = 'probabilites_matchs.npy'
+FICHIER_AGREGATS = 'agregats.npz'
+FICHIER_META = 'meta.json'
+
+
+def etiquette_json(equipe):
+    """Étiquette d'équipe sérialisable sans changer de type : un id entier reste un int au rechargement"""
+    if isinstance(equipe, np.generic):
+        equipe = equipe.item()
+    if isinstance(equipe, (int, str)) and not isinstance(equipe, bool):
+        return equipe
+    return str(equipe)
+
+
+def sauvegarder_resultats(dossier, resultats_simulations, metadata=None):
+    """
+    Écrit un run de simulation dans dossier :
+    - points.npy : matrice (n_simulations x n_equipes) int16, relue en memory-map
+    - probabilites_matchs.npy : probabilités (n_matchs x 3) utilisées
+    - agregats.npz : histogrammes, positions et moments (AccumulateurSimulations)
+    - meta.json : équipes, n_simulations et métadonnées du run (hash du modèle, seed...)
+    """
+    os.makedirs(dossier, exist_ok=True)
+    points = resultats_simulations['points']
+    accumulateur = resultats_simulations['accumulateur']
+
+    if points is not None:
+        chemin_points = os.path.join(dossier, FICHIER_POINTS)
+        deja_sur_disque = isinstance(points, np.memmap) and os.path.abspath(points.filename) == os.path.abspath(chemin_points)
+        if not deja_sur_disque:
+            np.save(chemin_points, points)
+        if accumulateur is None:
+            # Agrégats calculés une fois ici pour que les rapports n'aient pas à relire la matrice
+            accumulateur = AccumulateurSimulations.depuis_points(points)
+
+    np.save(os.path.join(dossier, FICHIER_PROBAS), resultats_simulations['probabilites_matchs'].to_numpy())
+    np.savez(
+        os.path.join(dossier, FICHIER_AGREGATS),
+        histogramme_points=accumulateur.histogramme_points,
+        comptes_positions=accumulateur.comptes_positions,
+        comptes_devant=accumulateur.comptes_devant,
+        comptes_titre_relegation=accumulateur.comptes_titre_relegation,
+        moyenne=accumulateur.moyenne,
+        m2=accumulateur.m2,
+        n_simulations=accumulateur.n_simulations,
+    )
+
+    meta = {
+        'equipes': [etiquette_json(equipe) for equipe in resultats_simulations['equipes']],
+        'n_simulations': int(resultats_simulations['n_simulations']),
+        'points_conserves': points is not None,
+        'date': datetime.now().isoformat(timespec='seconds'),
+        **(metadata or {}),
+    }
+    with open(os.path.join(dossier, FICHIER_META), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+
+def charger_resultats(dossier):
+    """
+    Recharge un run sans lire la matrice des points : elle est ouverte en memory-map
+    (lecture seule) et l'analyse est reconstruite à partir des agrégats.
+    Renvoie (resultats_simulations, meta).
+    """
+    with open(os.path.join(dossier, FICHIER_META), encoding='utf-8') as f:
+        meta = json.load(f)
+
+    agregats = np.load(os.path.join(dossier, FICHIER_AGREGATS))
+    histogramme = agregats['histogramme_points']
+    accumulateur = AccumulateurSimulations(histogramme.shape[0], histogramme.shape[1] - 1)
+    accumulateur.histogramme_points = histogramme
+    accumulateur.comptes_positions = agregats['comptes_positions']
+    accumulateur.comptes_devant = agregats['comptes_devant']
+    accumulateur.comptes_titre_relegation = agregats['comptes_titre_relegation']
+    accumulateur.moyenne = agregats['moyenne']
+    accumulateur.m2 = agregats['m2']
+    accumulateur.n_simulations = int(agregats['n_simulations'])
+
+    points = None
+    if meta['points_conserves']:
+        points = np.load(os.path.join(dossier, FICHIER_POINTS), mmap_mode='r')
+
+    probas = np.load(os.path.join(dossier, FICHIER_PROBAS))
+    resultats_simulations = {
+        'analyse': accumulateur.analyser(meta['equipes']),
+        'probabilites_relatives': accumulateur.probabilites_relatives(meta['equipes']),
+        'probabilites_matchs': pd.DataFrame(probas, columns=['proba_defaite', 'proba_nul', 'proba_victoire']),
+        'points': points,
+        'equipes': meta['equipes'],
+        'accumulateur': accumulateur,
+        'n_simulations': meta['n_simulations'],
+        'seed': meta.get('seed'),
+    }
+    return resultats_simulations, meta
@@ -1,40 +1,215 @@
+import os
+import threading
+import time
+import warnings
+from contextlib import contextmanager
+
 import psycopg2
+import psycopg2.extensions
+from psycopg2.pool import ThreadedConnectionPool
 from dotenv import load_dotenv
-import os
 
 # Load environment variables from .env
 load_dotenv()
 
-# Fetch variables
-USER = os.getenv("user")
-PASSWORD = os.getenv("password")
-HOST = os.getenv("host")
-PORT = os.getenv("port")
-DBNAME = os.getenv("dbname")
-
-# Connect to the database
-try:
-    connection = psycopg2.connect(
-        user=USER,
-        password=PASSWORD,
-        host=HOST,
-        port=PORT,
-        dbname=DBNAME
-    )
-    print("Connection successful!")
-    
-    # Create a cursor to execute SQL queries
-    cursor = connection.cursor()
-    
-    # Example query
-    cursor.execute("SELECT NOW();")
-    result = cursor.fetchone()
-    print("Current Time:", result)
-
-    # Close the cursor and connection
-    cursor.close()
-    connection.close()
-    print("Connection closed.")
-
-except Exception as e:
-    print(f"Failed to connect: {e}")
\ No newline at end of file
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config.yaml")
+
+# Une connexion restée inutilisée plus longtemps est vérifiée (SELECT 1) avant d'être prêtée
+HEALTH_CHECK_IDLE_S = 30
+
+_pool = None
+_pool_lock = threading.Lock()
+# Verrou distinct : le constructeur du pool ouvre des connexions (qui se comptent) sous _pool_lock
+_metrics_lock = threading.Lock()
+_slots = None
+_idle_since = {}
+_metrics = {
+    'borrows': 0,
+    'wait_total_s': 0.0,
+    'wait_max_s': 0.0,
+    'opened': 0,
+    'discarded': 0,
+    'in_use': 0,
+    'peak_in_use': 0,
+}
+
+
+def load_config():
+    """
+    Paramètres de connexion et du pool : section `database` de config.yaml,
+    surchargée par les variables d'environnement.
+    """
+    config = {}
+    if os.path.exists(CONFIG_PATH) and os.path.getsize(CONFIG_PATH) > 0:
+        try:
+            import yaml
+        except ImportError:
+            warnings.warn(f"PyYAML absent : {CONFIG_PATH} est ignoré, configuration depuis l'environnement seul")
+        else:
+            with open(CONFIG_PATH) as f:
+                config = (yaml.safe_load(f) or {}).get('database', {})
+
+    env = {
+        'user': os.getenv("user"),
+        'password': os.getenv("password"),
+        'host': os.getenv("host"),
+        'port': os.getenv("port"),
+        'dbname': os.getenv("dbname"),
+        'min_connections': os.getenv("DB_POOL_MIN"),
+        'max_connections': os.getenv("DB_POOL_MAX"),
+        'statement_timeout_ms': os.getenv("DB_STATEMENT_TIMEOUT_MS"),
+    }
+    config.update({cle: valeur for cle, valeur in env.items() if valeur is not None})
+    config.setdefault('port', 5432)
+    config['min_connections'] = int(config.get('min_connections', 1))
+    config['max_connections'] = int(config.get('max_connections', 5))
+    config['statement_timeout_ms'] = int(config.get('statement_timeout_ms', 60000))
+    return config
+
+
+class _CountedConnection(psycopg2.extensions.connection):
+    """Connexion qui se compte à l'ouverture (métrique `opened`)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        with _metrics_lock:
+            _metrics['opened'] += 1
+
+
+def get_pool():
+    """Pool partagé, créé au premier appel"""
+    global _pool, _slots
+    with _pool_lock:
+        if _pool is None:
+            config = load_config()
+            _pool = ThreadedConnectionPool(
+                config['min_connections'], config['max_connections'],
+                user=config.get('user'), password=config.get('password'),
+                host=config.get('host'), port=config['port'], dbname=config.get('dbname'),
+                options=f"-c statement_timeout={config['statement_timeout_ms']}",
+                connection_factory=_CountedConnection,
+            )
+            # getconn lève PoolError quand le pool est plein : le sémaphore fait attendre à la place
+            _slots = threading.BoundedSemaphore(config['max_connections'])
+        return _pool
+
+
+def _is_healthy(conn):
+    if conn.closed:
+        return False
+    if time.monotonic() - _idle_since.get(id(conn), time.monotonic()) < HEALTH_CHECK_IDLE_S:
+        return True
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1;")
+        conn.rollback()
+        return True
+    except psycopg2.Error:
+        return False
+
+
+def _borrow():
+    pool = get_pool()
+    debut = time.perf_counter()
+    _slots.acquire()
+    try:
+        conn = pool.getconn()
+        while not _is_healthy(conn):
+            _idle_since.pop(id(conn), None)
+            pool.putconn(conn, close=True)
+            with _metrics_lock:
+                _metrics['discarded'] += 1
+            conn = pool.getconn()
+    except Exception:
+        _slots.release()
+        raise
+    attente = time.perf_counter() - debut
+
+    with _metrics_lock:
+        _metrics['borrows'] += 1
+        _metrics['wait_total_s'] += attente
+        _metrics['wait_max_s'] = max(_metrics['wait_max_s'], attente)
+        _metrics['in_use'] += 1
+        _metrics['peak_in_use'] = max(_metrics['peak_in_use'], _metrics['in_use'])
+    return conn
+
+
+def _give_back(conn):
+    close = bool(conn.closed)
+    if not close:
+        try:
+            # Ne jamais rendre au pool une transaction ouverte ou une connexion en autocommit
+            conn.rollback()
+            conn.autocommit = False
+        except psycopg2.Error:
+            close = True
+    _idle_since[id(conn)] = time.monotonic()
+    if close:
+        _idle_since.pop(id(conn), None)
+    get_pool().putconn(conn, close=close)
+    with _metrics_lock:
+        _metrics['in_use'] -= 1
+        if close:
+            _metrics['discarded'] += 1
+    _slots.release()
+
+
+@contextmanager
+def connection(autocommit=False):
+    """
+    Emprunte une connexion au pool et la rend en sortie de bloc (ce qui n'a pas été
+    commité est annulé). autocommit=True pour exécuter chaque commande indépendamment.
+    """
+    conn = _borrow()
+    try:
+        conn.autocommit = autocommit
+        yield conn
+    finally:
+        _give_back(conn)
+
+
+@contextmanager
+def transaction():
+    """Connexion empruntée le temps d'une transaction : commit en sortie, rollback sur exception"""
+    with connection() as conn:
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+
+def pool_metrics():
+    """Emprunts, temps d'attente du pool et nombre de connexions (ouvertes, jetées, en cours, pic)"""
+    with _metrics_lock:
+        metrics = dict(_metrics)
+    metrics['wait_mean_s'] = metrics['wait_total_s'] / metrics['borrows'] if metrics['borrows'] else 0.0
+    metrics['open'] = metrics['opened'] - metrics['discarded']
+    return metrics
+
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+            _idle_since.clear()
+
+
+if __name__ == "__main__":
+    # Test de connexion
+    try:
+        with connection() as conn:
+            print("Connection successful!")
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT NOW();")
+                result = cursor.fetchone()
+            print("Current Time:", result)
+        print("Pool:", pool_metrics())
+        close_pool()
+        print("Connection closed.")
+
+    except Exception as e:
+        print(f"Failed to connect: {e}")
@@ -1,21 +1,12 @@
-import pandas as pd
-import psycopg2
-from psycopg2.extras import execute_batch
-from dotenv import load_dotenv
 import os
+import sys
 
-load_dotenv()
-USER = os.getenv("user")
-PASSWORD = os.getenv("password")
-HOST = os.getenv("host")
-PORT = os.getenv("port")
-DBNAME = os.getenv("dbname")
+import pandas as pd
+from psycopg2.extras import execute_batch
 
-def get_connection():
-    conn = psycopg2.connect(
-        user=USER, password=PASSWORD, host=HOST, port=PORT, dbname=DBNAME
-    )
-    return conn
+# Accès base partagé (pool de connexions) : supabase/db.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from db import connection, transaction
 
 def fetch_matches(season_id):
     query = """
@@ -25,9 +16,8 @@ def fetch_matches(season_id):
         WHERE season_id = %s
         ORDER BY date_match ASC
     """
-    conn = get_connection()
-    df = pd.read_sql(query, conn, params=(season_id,))
-    conn.close()
+    with connection() as conn:
+        df = pd.read_sql(query, conn, params=(season_id,))
     return df
 
 def fetch_team_stats_before_season(season_id):
@@ -35,9 +25,8 @@ def fetch_team_stats_before_season(season_id):
         SELECT * FROM team_season1
         WHERE season_id = %s -1
     """
-    conn = get_connection()
-    df = pd.read_sql(query, conn, params=(season_id,))
-    conn.close()
+    with connection() as conn:
+        df = pd.read_sql(query, conn, params=(season_id,))
     return df
 
 def fetch_h2h(home_team_id, away_team_id, season_id):
@@ -50,15 +39,86 @@ def fetch_h2h(home_team_id, away_team_id, season_id):
         ORDER BY date_match DESC
         LIMIT 5
     """
-    conn = get_connection()
-    df = pd.read_sql(query, conn, params=(home_team_id, away_team_id, away_team_id, home_team_id, season_id))
-    conn.close()
+    with connection() as conn:
+        df = pd.read_sql(query, conn, params=(home_team_id, away_team_id, away_team_id, home_team_id, season_id))
     return df
 
-def generate_dataset(season_id):
+def fetch_h2h_season(season_id):
+    """
+    Les 5 dernières confrontations (season_id <= saison, comme fetch_h2h) de chaque paire
+    d'équipes qui se rencontre dans la saison, en une seule requête : ROW_NUMBER() sur la
+    paire non ordonnée (LEAST / GREATEST) remplace un LIMIT 5 par match.
+    """
+    query = """
+        WITH paires AS (
+            SELECT DISTINCT LEAST(home_team_id, away_team_id) AS team_a,
+                            GREATEST(home_team_id, away_team_id) AS team_b
+            FROM match_stats
+            WHERE season_id = %(season_id)s
+        ),
+        h2h AS (
+            SELECT p.team_a, p.team_b,
+                   m.home_team_id, m.away_team_id, m.home_goals, m.away_goals,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY p.team_a, p.team_b
+                       ORDER BY m.date_match DESC
+                   ) AS rang
+            FROM match_stats m
+            JOIN paires p
+              ON LEAST(m.home_team_id, m.away_team_id) = p.team_a
+             AND GREATEST(m.home_team_id, m.away_team_id) = p.team_b
+            WHERE m.season_id <= %(season_id)s
+        )
+        SELECT team_a, team_b, home_team_id, away_team_id, home_goals, away_goals
+        FROM h2h
+        WHERE rang <= 5
+    """
+    with connection() as conn:
+        df = pd.read_sql(query, conn, params={'season_id': season_id})
+    return df
+
+def compute_h2h_features(matches, h2h):
+    """
+    Features h2h de chaque match (index match_id), mêmes formules que la boucle sur fetch_h2h :
+    victoires comptées dans l'orientation du match courant, moyennes dans celle de la confrontation.
+    """
+    paires = matches[['match_id', 'home_team_id', 'away_team_id']].assign(
+        team_a=matches[['home_team_id', 'away_team_id']].min(axis=1),
+        team_b=matches[['home_team_id', 'away_team_id']].max(axis=1),
+    )
+    df = paires.merge(h2h, on=['team_a', 'team_b'], how='left', suffixes=('', '_h2h'))
+
+    df['h2h_home_wins'] = (df['home_team_id_h2h'] == df['home_team_id']) & (df['home_goals'] > df['away_goals'])
+    df['h2h_away_wins'] = (df['away_team_id_h2h'] == df['away_team_id']) & (df['away_goals'] > df['home_goals'])
+    df['h2h_draws'] = df['home_goals'] == df['away_goals']
+    df['goal_diff'] = df['home_goals'] - df['away_goals']
+
+    features = df.groupby('match_id').agg(
+        h2h_home_wins=('h2h_home_wins', 'sum'),
+        h2h_away_wins=('h2h_away_wins', 'sum'),
+        h2h_draws=('h2h_draws', 'sum'),
+        h2h_avg_goal_diff_home=('goal_diff', 'mean'),
+        h2h_avg_goals_home_scored=('home_goals', 'mean'),
+        h2h_avg_goals_away_scored=('away_goals', 'mean'),
+    )
+    # Paire sans confrontation : moyennes à 0 comme pour un h2h vide
+    return features.fillna(0)
+
+def generate_dataset(season_id, h2h_index=None):
+    """
+    h2h_index (index_h2h.IndexH2H) : h2h calculé sans fuite, sur les confrontations
+    strictement antérieures à chaque match, au lieu de season_id <= saison.
+    """
     matches = fetch_matches(season_id)
     stats_df = fetch_team_stats_before_season(season_id)
     stats_map = stats_df.set_index('team_season_id').to_dict(orient='index')
+    if h2h_index is None:
+        h2h_features = compute_h2h_features(matches, fetch_h2h_season(season_id))
+    else:
+        h2h_features = h2h_index.features(
+            matches['home_team_id'], matches['away_team_id'], matches['date_match']
+        ).set_index(matches['match_id'])
+    h2h_map = {col: h2h_features[col].to_dict() for col in h2h_features.columns}
 
     rows = []
 
@@ -69,14 +129,14 @@ def generate_dataset(season_id):
         home_stats = stats_map.get(home_id, {})
         away_stats = stats_map.get(away_id, {})
 
-        # Head-to-head
-        h2h = fetch_h2h(home_id, away_id, season_id)
-        h2h_home_wins = ((h2h['home_team_id'] == home_id) & (h2h['home_goals'] > h2h['away_goals'])).sum()
-        h2h_away_wins = ((h2h['away_team_id'] == away_id) & (h2h['away_goals'] > h2h['home_goals'])).sum()
-        h2h_draws = (h2h['home_goals'] == h2h['away_goals']).sum()
-        h2h_avg_goal_diff_home = ((h2h['home_goals'] - h2h['away_goals']).mean() if not h2h.empty else 0)
-        h2h_avg_goals_home_scored = (h2h['home_goals'].mean() if not h2h.empty else 0)
-        h2h_avg_goals_away_scored = (h2h['away_goals'].mean() if not h2h.empty else 0)
+        # Head-to-head (calculé pour toute la saison avant la boucle)
+        match_id = match['match_id']
+        h2h_home_wins = h2h_map['h2h_home_wins'][match_id]
+        h2h_away_wins = h2h_map['h2h_away_wins'][match_id]
+        h2h_draws = h2h_map['h2h_draws'][match_id]
+        h2h_avg_goal_diff_home = h2h_map['h2h_avg_goal_diff_home'][match_id]
+        h2h_avg_goals_home_scored = h2h_map['h2h_avg_goals_home_scored'][match_id]
+        h2h_avg_goals_away_scored = h2h_map['h2h_avg_goals_away_scored'][match_id]
 
         # Label
         if match['home_goals'] > match['away_goals']:
@@ -123,28 +183,22 @@ def generate_dataset(season_id):
 
 def insert_training_dataset(df, table="training_modele_season"):
     """Insère le DataFrame dans la table Supabase"""
-    conn = get_connection()
+    columns = list(df.columns)
+    placeholders = ", ".join(["%s"] * len(columns))
+    columns_sql = ", ".join(columns)
+    query = f"""
+        INSERT INTO {table} ({columns_sql})
+        VALUES ({placeholders})
+        ON CONFLICT (match_id) DO NOTHING;
+    """
+    rows = [tuple(r) for r in df.to_numpy()]
     try:
-        cur = conn.cursor()
-        columns = list(df.columns)
-        placeholders = ", ".join(["%s"] * len(columns))
-        columns_sql = ", ".join(columns)
-        query = f"""
-            INSERT INTO {table} ({columns_sql})
-            VALUES ({placeholders})
-            ON CONFLICT (match_id) DO NOTHING;
-        """
-        rows = [tuple(r) for r in df.to_numpy()]
-        execute_batch(cur, query, rows, page_size=50)
-        conn.commit()  
+        with transaction() as conn, conn.cursor() as cur:
+            execute_batch(cur, query, rows, page_size=50)
         print(f" {len(df)} lignes insérées dans {table}")
     except Exception as e:
-        conn.rollback() 
         print(f"Erreur lors de l'insertion: {e}")
         raise
-    finally:
-        cur.close()
-        conn.close()
 
 if __name__ == "__main__":
     for season_id in range(2, 7):  # On insere pas la premiere et la derniere saison pour ce modele
@@ -0,0 +1,108 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Accès base partagé (pool de connexions) : supabase/db.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from db import connection
+
+def fetch_all_matches():
+    """Tout match_stats en une requête (les colonnes utiles au h2h)"""
+    query = """
+        SELECT match_id, date_match, home_team_id, away_team_id, home_goals, away_goals
+        FROM match_stats
+        WHERE home_goals IS NOT NULL AND away_goals IS NOT NULL
+    """
+    with connection() as conn:
+        df = pd.read_sql(query, conn)
+    return df
+
+
+class IndexH2H:
+    """
+    Index en mémoire des confrontations directes, construit une fois depuis match_stats.
+    Les matchs sont triés par (paire non ordonnée, date) dans des tableaux NumPy compacts ;
+    "les N dernières confrontations strictement avant la date D" est une recherche binaire
+    sur une clé composite paire * (n_dates + 1) + rang de la date.
+    """
+
+    def __init__(self, matches):
+        home = matches['home_team_id'].to_numpy(dtype=np.int64)
+        away = matches['away_team_id'].to_numpy(dtype=np.int64)
+        dates = pd.to_datetime(matches['date_match']).to_numpy()
+
+        self.width = int(max(home.max(), away.max())) + 1
+        self.unique_dates = np.unique(dates)
+        pair = self.pair_key(home, away)
+        date_rank = np.searchsorted(self.unique_dates, dates)
+
+        # Tri par paire puis date (puis match_id pour départager deux matchs le même jour)
+        tie_break = matches['match_id'].to_numpy() if 'match_id' in matches else np.arange(len(matches))
+        order = np.lexsort((tie_break, date_rank, pair))
+        self.keys = (pair * (len(self.unique_dates) + 1) + date_rank)[order]
+        self.home_team_id = home[order]
+        self.away_team_id = away[order]
+        self.home_goals = matches['home_goals'].to_numpy(dtype=np.int64)[order]
+        self.away_goals = matches['away_goals'].to_numpy(dtype=np.int64)[order]
+
+    @classmethod
+    def from_database(cls):
+        return cls(fetch_all_matches())
+
+    def pair_key(self, team_1, team_2):
+        return np.minimum(team_1, team_2) * self.width + np.maximum(team_1, team_2)
+
+    def bounds(self, home_ids, away_ids, dates):
+        """(début de la paire, fin exclusive = premier match à la date D ou après) pour chaque requête"""
+        home_ids = np.asarray(home_ids, dtype=np.int64)
+        away_ids = np.asarray(away_ids, dtype=np.int64)
+        # Équipe absente de l'index : paire hors bornes, donc aucune confrontation
+        known = (home_ids < self.width) & (away_ids < self.width)
+        pair = np.where(known, self.pair_key(home_ids, away_ids), self.width ** 2)
+
+        n_dates = len(self.unique_dates) + 1
+        date_rank = np.searchsorted(self.unique_dates, pd.to_datetime(dates).to_numpy(), side='left')
+        start = np.searchsorted(self.keys, pair * n_dates, side='left')
+        end = np.searchsorted(self.keys, pair * n_dates + date_rank, side='left')
+        return start, end
+
+    def last_meetings(self, home_id, away_id, date, n=5):
+        """Les n dernières confrontations strictement avant date, de la plus récente à la plus ancienne"""
+        start, end = self.bounds([home_id], [away_id], [date])
+        indices = np.arange(end[0] - 1, max(start[0], end[0] - n) - 1, -1)
+        return pd.DataFrame({
+            'home_team_id': self.home_team_id[indices],
+            'away_team_id': self.away_team_id[indices],
+            'home_goals': self.home_goals[indices],
+            'away_goals': self.away_goals[indices],
+        })
+
+    def features(self, home_ids, away_ids, dates, n=5):
+        """
+        Features h2h de chaque match en une passe vectorisée, mêmes formules que
+        generate_dataset, sur les n dernières confrontations strictement avant la date du match.
+        """
+        home_ids = np.asarray(home_ids, dtype=np.int64)
+        away_ids = np.asarray(away_ids, dtype=np.int64)
+        start, end = self.bounds(home_ids, away_ids, dates)
+        n_h2h = np.minimum(end - start, n)
+
+        # Matrice (n_matchs x n) des positions, masquée au-delà des confrontations disponibles
+        valid = np.arange(n) < n_h2h[:, None]
+        indices = np.where(valid, end[:, None] - 1 - np.arange(n), 0)
+        home_goals = self.home_goals[indices]
+        away_goals = self.away_goals[indices]
+
+        home_wins = (self.home_team_id[indices] == home_ids[:, None]) & (home_goals > away_goals)
+        away_wins = (self.away_team_id[indices] == away_ids[:, None]) & (away_goals > home_goals)
+        divisor = np.maximum(n_h2h, 1)
+        return pd.DataFrame({
+            'h2h_home_wins': (home_wins & valid).sum(axis=1),
+            'h2h_away_wins': (away_wins & valid).sum(axis=1),
+            'h2h_draws': ((home_goals == away_goals) & valid).sum(axis=1),
+            'h2h_avg_goal_diff_home': np.where(valid, home_goals - away_goals, 0).sum(axis=1) / divisor,
+            'h2h_avg_goals_home_scored': np.where(valid, home_goals, 0).sum(axis=1) / divisor,
+            'h2h_avg_goals_away_scored': np.where(valid, away_goals, 0).sum(axis=1) / divisor,
+        })
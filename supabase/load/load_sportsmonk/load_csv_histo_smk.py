@@ -1,16 +1,12 @@
 #Charger le fichier csv généré par extract_match_histo_api_sportsmonk dans la base de données
 import pandas as pd
-from dotenv import load_dotenv
-import psycopg2
 import os
+import sys
 
-# Chargement des variables d’environnement
-load_dotenv()
-USER = os.getenv("user")
-PASSWORD = os.getenv("password")
-HOST = os.getenv("host")
-PORT = os.getenv("port")
-DBNAME = os.getenv("dbname")
+# Accès base partagé (pool de connexions) : supabase/db.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import db
+from teams import get_team_resolver
 
 def insert_matches(df, connection):
     """
@@ -22,7 +18,12 @@ def insert_matches(df, connection):
     ignored = 0
     cursor = connection.cursor()
 
-    for _, row in df.iterrows():
+    # team_id de toutes les lignes en une fois (équipes inconnues signalées une fois par nom)
+    resolver = get_team_resolver()
+    home_team_ids = resolver.resolve(df["home_team"], connection)
+    away_team_ids = resolver.resolve(df["away_team"], connection)
+
+    for (_, row), home_team_id, away_team_id in zip(df.iterrows(), home_team_ids, away_team_ids):
         try:
             # Normalisation des noms et champs obligatoires
             fixture_id = str(row.get("fixture_id")).strip()
@@ -30,8 +31,8 @@ def insert_matches(df, connection):
             season_label = str(row.get("season_label")).strip()
             date_match = row.get("Date_Match")
 
-            home_team = str(row.get("home_team")).strip()
-            away_team = str(row.get("away_team")).strip()
+            home_team_name = str(row.get("home_team")).strip()
+            away_team_name = str(row.get("away_team")).strip()
             home_goals = row.get("home_goals")
             away_goals = row.get("away_goals")
             home_possession = row.get("home_possession")
@@ -51,7 +52,7 @@ def insert_matches(df, connection):
             home_adv = row.get("adv_home")
 
             # Vérification champs obligatoires
-            if None in (fixture_id, home_team_name, away_team_name, date_match, season_name, home_score, away_score):
+            if None in (fixture_id, home_team_name, away_team_name, date_match, season_label, home_goals, away_goals):
                 ignored += 1
                 print(f"⚠️ Ligne ignorée : champs obligatoires manquants")
                 continue
@@ -59,29 +60,17 @@ def insert_matches(df, connection):
             # Conversion de la date
             date_match_obj = pd.to_datetime(date_match, dayfirst=True).date()
 
-            # Récupérer team_id
-            cursor.execute("SELECT team_id FROM teams WHERE name = %s;", (home_team_name,))
-            home_team = cursor.fetchone()
-            if not home_team:
-                print(f"⚠️ Équipe domicile '{home_team_name}' introuvable -> ligne ignorée")
-                ignored += 1
-                continue
-            home_team_id = home_team[0]
-
-            cursor.execute("SELECT team_id FROM teams WHERE name = %s;", (away_team_name,))
-            away_team = cursor.fetchone()
-            if not away_team:
-                print(f"⚠️ Équipe extérieur '{away_team_name}' introuvable -> ligne ignorée")
+            if pd.isna(home_team_id) or pd.isna(away_team_id):
                 ignored += 1
                 continue
-            away_team_id = away_team[0]
+            home_team_id, away_team_id = int(home_team_id), int(away_team_id)
 
             # Insérer le match avec season texte
             cursor.execute("""
             INSERT INTO match (season, date_match, home_team_id, away_team_id, home_score, away_score)
             VALUES (%s, %s, %s, %s, %s, %s)
             ON CONFLICT DO NOTHING;
-        """, (season_name, date_match_obj, home_team_id, away_team_id, int(home_score), int(away_score)))
+        """, (season_label, date_match_obj, home_team_id, away_team_id, int(home_goals), int(away_goals)))
             inserted += 1
 
         except Exception as e:
@@ -93,20 +82,10 @@ def insert_matches(df, connection):
 
 def main():
     try:
-        connection = psycopg2.connect(
-            user=USER,
-            password=PASSWORD,
-            host=HOST,
-            port=PORT,  
-            dbname=DBNAME
-        )
-        connection.autocommit = True  # Chaque commande est indépendante
-
         df = pd.read_csv("data/processed/matchs_historiques.csv")
 
-        insert_matches(df, connection)
-
-        connection.close()
+        with db.connection(autocommit=True) as connection:  # Chaque commande est indépendante
+            insert_matches(df, connection)
 
     except Exception as e:
         print(f" Connexion DB échouée ou erreur SQL : {e}")
@@ -1,17 +1,15 @@
 import pandas as pd
-from dotenv import load_dotenv
-import psycopg2
+import argparse
+import io
 import os
+import sys
 import datetime
 
 
-# Chargement des variables d’environnement
-load_dotenv()
-USER = os.getenv("user")
-PASSWORD = os.getenv("password")
-HOST = os.getenv("host")
-PORT = os.getenv("port")
-DBNAME = os.getenv("dbname")
+# Accès base partagé (pool de connexions) : supabase/db.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import db
+from teams import get_team_resolver
 
 def insert_match_stats(df, connection):
     """
@@ -22,7 +20,12 @@ def insert_match_stats(df, connection):
     ignored = 0
     cursor = connection.cursor()
 
-    for _, row in df.iterrows():
+    # team_id de toutes les lignes en une fois (équipes inconnues signalées une fois par nom)
+    resolver = get_team_resolver()
+    home_team_ids = resolver.resolve(df["home_team"], connection)
+    away_team_ids = resolver.resolve(df["away_team"], connection)
+
+    for (_, row), home_team_id, away_team_id in zip(df.iterrows(), home_team_ids, away_team_ids):
         try:
             fixture_id = int(row.get("fixture_id"))
             season_label = str(row.get("season_label")).strip()
@@ -31,22 +34,10 @@ def insert_match_stats(df, connection):
             home_team_name = str(row.get("home_team")).strip()
             away_team_name = str(row.get("away_team")).strip()
 
-            # Récupérer team_id
-            cursor.execute("SELECT team_id FROM teams WHERE name = %s;", (home_team_name,))
-            home_team = cursor.fetchone()
-            if not home_team:
-                print(f"⚠️ Équipe domicile '{home_team_name}' introuvable -> ligne ignorée")
+            if pd.isna(home_team_id) or pd.isna(away_team_id):
                 ignored += 1
                 continue
-            home_team_id = home_team[0]
-
-            cursor.execute("SELECT team_id FROM teams WHERE name = %s;", (away_team_name,))
-            away_team = cursor.fetchone()
-            if not away_team:
-                print(f"⚠️ Équipe extérieur '{away_team_name}' introuvable -> ligne ignorée")
-                ignored += 1
-                continue
-            away_team_id = away_team[0]
+            home_team_id, away_team_id = int(home_team_id), int(away_team_id)
 
             # Conversion de la date*
             if not date_match or pd.isna(date_match):
@@ -112,27 +103,127 @@ def insert_match_stats(df, connection):
     print(f"\n✅ Insertion terminée : {inserted} lignes insérées, {ignored} ignorées.")
 
 
-def main():
-    try:
-        connection = psycopg2.connect(
-            user=USER,
-            password=PASSWORD,
-            host=HOST,
-            port=PORT,  
-            dbname=DBNAME
+# Colonnes de stats copiées telles quelles du CSV vers match_stats
+STAT_COLUMNS = [
+    "home_goals", "away_goals",
+    "home_possession", "away_possession",
+    "home_shots_on_target", "away_shots_on_target",
+    "home_fouls", "away_fouls",
+    "home_passes", "away_passes",
+    "home_corners", "away_corners",
+    "home_attacks", "away_attacks",
+    "home_dangerous_attacks", "away_dangerous_attacks",
+]
+
+
+def prepare_match_stats(df):
+    """
+    Validation vectorisée de insert_match_stats : fixture_id entier, date convertible
+    (élément par élément, comme pd.to_datetime sur chaque ligne), noms d'équipes nettoyés.
+    Renvoie (lignes valides dans l'ordre du CSV, nombre de lignes rejetées).
+    """
+    prepared = pd.DataFrame({
+        "row_number": range(len(df)),
+        "fixture_id": pd.to_numeric(df["fixture_id"], errors="coerce"),
+        "season_label": df["season_label"].astype(str).str.strip(),
+        "date_match": pd.to_datetime(df["date_match"].astype(str).str.strip(), errors="coerce", format="mixed"),
+        "home_team": df["home_team"].astype(str).str.strip(),
+        "away_team": df["away_team"].astype(str).str.strip(),
+    })
+    for col in STAT_COLUMNS:
+        prepared[col] = pd.to_numeric(df[col], errors="coerce").astype("Int64")
+
+    valid = prepared["fixture_id"].notna() & prepared["date_match"].notna()
+    prepared = prepared[valid].copy()
+    prepared["fixture_id"] = prepared["fixture_id"].astype("int64")
+    prepared["date_match"] = prepared["date_match"].dt.date
+    return prepared, int((~valid).sum())
+
+
+def insert_match_stats_bulk(df, connection):
+    """
+    Même résultat que insert_match_stats en trois requêtes : COPY des lignes validées dans
+    une table temporaire, jointure sur teams pour les team_id, puis un seul
+    INSERT ... SELECT ... ON CONFLICT (fixture_id) DO NOTHING.
+    La connexion ne doit pas être en autocommit (la table temporaire vit le temps de la transaction).
+    Renvoie (inserted, skipped).
+    """
+    prepared, invalid = prepare_match_stats(df)
+    cursor = connection.cursor()
+
+    cursor.execute(f"""
+        CREATE TEMP TABLE staging_match_stats (
+            row_number INTEGER, fixture_id BIGINT, season_label TEXT, date_match DATE,
+            home_team TEXT, away_team TEXT,
+            {", ".join(f"{col} INTEGER" for col in STAT_COLUMNS)}
+        ) ON COMMIT DROP;
+    """)
+    buffer = io.StringIO()
+    prepared.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+    cursor.copy_expert("COPY staging_match_stats FROM STDIN WITH (FORMAT csv)", buffer)
+
+    # Équipes inconnues : signalées une fois par nom, pas une fois par ligne
+    cursor.execute("""
+        SELECT s.name, COUNT(*)
+        FROM (
+            SELECT home_team AS name FROM staging_match_stats
+            UNION ALL
+            SELECT away_team FROM staging_match_stats
+        ) s
+        WHERE NOT EXISTS (SELECT 1 FROM teams t WHERE t.name = s.name)
+        GROUP BY s.name
+        ORDER BY s.name;
+    """)
+    for name, count in cursor.fetchall():
+        print(f"⚠️ Équipe '{name}' introuvable -> {count} ligne(s) ignorée(s)")
+
+    # ORDER BY row_number : à fixture_id égal, la première ligne du CSV l'emporte comme en ligne par ligne
+    cursor.execute(f"""
+        INSERT INTO match_stats (
+            fixture_id, season_label, date_match,
+            home_team_id, away_team_id,
+            {", ".join(STAT_COLUMNS)},
+            adv_home
         )
-        connection.autocommit = True  # exécuter ligne par ligne
+        SELECT s.fixture_id, s.season_label, s.date_match,
+               h.team_id, a.team_id,
+               {", ".join(f"s.{col}" for col in STAT_COLUMNS)},
+               TRUE
+        FROM staging_match_stats s
+        JOIN teams h ON h.name = s.home_team
+        JOIN teams a ON a.name = s.away_team
+        ORDER BY s.row_number
+        ON CONFLICT (fixture_id) DO NOTHING;
+    """)
+    inserted = cursor.rowcount
+    cursor.close()
 
+    skipped = len(df) - inserted
+    print(f"\n✅ Insertion terminée : {inserted} lignes insérées, {skipped} ignorées "
+          f"({invalid} invalides, le reste équipe inconnue ou fixture déjà présente).")
+    return inserted, skipped
+
+
+def main(row_by_row=False):
+    try:
         # Charger le CSV généré précédemment
         df = pd.read_csv("data/processed/fixtures_stats.csv")
 
-        insert_match_stats(df, connection)
-
-        connection.close()
+        if row_by_row:
+            with db.connection(autocommit=True) as connection:  # exécuter ligne par ligne
+                insert_match_stats(df, connection)
+        else:
+            with db.transaction() as connection:
+                insert_match_stats_bulk(df, connection)
 
     except Exception as e:
         print(f"❌ Connexion DB échouée ou erreur SQL : {e}")
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Charge fixtures_stats.csv dans match_stats")
+    parser.add_argument("--ligne-par-ligne", action="store_true",
+                        help="Ancien mode : un INSERT autocommité par ligne")
+    args = parser.parse_args()
+    main(row_by_row=args.ligne_par_ligne)
@@ -0,0 +1,116 @@
+import os
+import sys
+import time
+
+import pandas as pd
+
+# Accès base partagé (pool de connexions) : supabase/db.py
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from db import connection
+
+# Au plus une vérification de l'empreinte de teams par intervalle (hors noms inconnus)
+REFRESH_INTERVAL_S = 60
+
+FINGERPRINT_QUERY = """
+    SELECT COUNT(*), md5(COALESCE(string_agg(team_id::text || ':' || name, ',' ORDER BY team_id), ''))
+    FROM teams
+"""
+
+
+class TeamResolver:
+    """
+    Table teams chargée une fois en mémoire : résolution nom -> team_id et team_id -> nom
+    d'une colonne entière par Series.map, au lieu d'un SELECT par ligne.
+    Le cache se recharge quand l'empreinte de la table (nombre de lignes + md5 des couples
+    id:nom) change ; elle est vérifiée au plus toutes les REFRESH_INTERVAL_S secondes,
+    et à chaque résolution qui rencontre des noms inconnus (équipe ajoutée entre-temps).
+    """
+
+    def __init__(self):
+        self.ids_by_name = {}
+        self.names_by_id = {}
+        self.fingerprint = None
+        self.checked_at = None
+
+    def _fetch_fingerprint(self, conn):
+        with conn.cursor() as cur:
+            cur.execute(FINGERPRINT_QUERY)
+            return tuple(cur.fetchone())
+
+    def _load(self, conn):
+        with conn.cursor() as cur:
+            cur.execute("SELECT team_id, name FROM teams ORDER BY team_id;")
+            rows = cur.fetchall()
+        # Nom en double : le plus petit team_id, comme le premier fetchone de l'ancien SELECT
+        self.ids_by_name = {}
+        for team_id, name in rows:
+            self.ids_by_name.setdefault(name, team_id)
+        self.names_by_id = dict(rows)
+
+    def refresh(self, conn=None, force=False):
+        """Recharge teams si son empreinte a changé (ou si force). Renvoie True si rechargé."""
+        if conn is None:
+            with connection() as conn:
+                return self.refresh(conn, force)
+        fingerprint = self._fetch_fingerprint(conn)
+        self.checked_at = time.monotonic()
+        if not force and fingerprint == self.fingerprint:
+            return False
+        self._load(conn)
+        self.fingerprint = fingerprint
+        return True
+
+    def _ensure_fresh(self, conn):
+        if self.checked_at is None or time.monotonic() - self.checked_at > REFRESH_INTERVAL_S:
+            self.refresh(conn)
+
+    def resolve(self, names, conn=None, report=True):
+        """
+        team_id (Int64, <NA> si inconnu) de chaque nom de la colonne, noms nettoyés par strip.
+        Les noms inconnus sont signalés une fois chacun avec leur nombre de lignes.
+        """
+        names = pd.Series(names).astype(str).str.strip()
+        if conn is None:
+            with connection() as conn:
+                return self.resolve(names, conn, report)
+
+        self._ensure_fresh(conn)
+        ids = names.map(self.ids_by_name)
+        if ids.isna().any() and self.refresh(conn):
+            ids = names.map(self.ids_by_name)
+
+        if report:
+            for name, count in names[ids.isna()].value_counts().sort_index().items():
+                print(f"⚠️ Équipe '{name}' introuvable -> {count} ligne(s) ignorée(s)")
+        return ids.astype("Int64")
+
+    def unknown(self, names, conn=None):
+        """Noms de la colonne absents de teams (triés, sans doublon)"""
+        names = pd.Series(names).astype(str).str.strip()
+        ids = self.resolve(names, conn, report=False)
+        return sorted(names[ids.isna()].unique())
+
+    def names(self, team_ids, conn=None):
+        """Nom de chaque team_id de la colonne ; l'id lui-même (en texte) s'il est inconnu"""
+        team_ids = pd.Series(team_ids)
+        if conn is None:
+            with connection() as conn:
+                return self.names(team_ids, conn)
+
+        self._ensure_fresh(conn)
+        keys = pd.to_numeric(team_ids, errors="coerce")
+        names = keys.map(self.names_by_id)
+        if names.isna().any() and self.refresh(conn):
+            names = keys.map(self.names_by_id)
+        return names.fillna(team_ids.astype(str))
+
+
+_resolver = None
+
+
+def get_team_resolver():
+    """Résolveur partagé par tous les loaders du process"""
+    global _resolver
+    if _resolver is None:
+        _resolver = TeamResolver()
+    return _resolver
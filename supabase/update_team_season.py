@@ -1,27 +1,11 @@
-import psycopg2
-from psycopg2.extras import execute_batch
-from dotenv import load_dotenv
 import os
+import sys
 
-# Charger variables d'environnement
-load_dotenv()
-USER = os.getenv("user")
-PASSWORD = os.getenv("password")
-HOST = os.getenv("host")
-PORT = os.getenv("port")
-DBNAME = os.getenv("dbname")
+from psycopg2.extras import execute_batch
 
-def get_connection():
-    """Retourne une connexion PostgreSQL avec autocommit."""
-    conn = psycopg2.connect(
-        user=USER,
-        password=PASSWORD,
-        host=HOST,
-        port=PORT,
-        dbname=DBNAME
-    )
-    conn.autocommit = True
-    return conn
+# Accès base partagé (pool de connexions) : supabase/db.py
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from db import transaction
 
 def upsert_teams_season(df, table="team_season1"):
     """
@@ -71,15 +55,10 @@ def upsert_teams_season(df, table="team_season1"):
             away_dangerous_attacks = EXCLUDED.away_dangerous_attacks;
     """
 
-    conn = get_connection()
-    cur = conn.cursor()
-    
     # Transformer le DataFrame en liste de tuples
     rows = [tuple(row) for row in df.to_numpy()]
     
-    # Exécution batch pour optimiser l'insertion
-    execute_batch(cur, query, rows, page_size=50)
-    
-    cur.close()
-    conn.close()
+    # Exécution batch pour optimiser l'insertion, dans une seule transaction
+    with transaction() as conn, conn.cursor() as cur:
+        execute_batch(cur, query, rows, page_size=50)
     print(f"✅ {len(rows)} lignes insérées ou mises à jour dans {table}.")
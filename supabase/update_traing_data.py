@@ -1,15 +1,12 @@
-import psycopg2
-from psycopg2.extras import execute_batch
 import os
+import sys
+
+from psycopg2.extras import execute_batch
+
+# Accès base partagé (pool de connexions) : supabase/db.py
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from db import transaction
 
-def get_connection():
-    return psycopg2.connect(
-        dbname=os.getenv("dbname"),
-        user=os.getenv("user"),
-        password=os.getenv("password"),
-        host=os.getenv("host"),
-        port=os.getenv("port", 5432),
-    )
 def upsert_training_data(df):
     """
     Insère ou met à jour les données d'entraînement dans la table season_training_data.
@@ -31,8 +28,6 @@ def upsert_training_data(df):
         {", ".join([f"{col}=EXCLUDED.{col}" for col in cols if col != "match_id"])};
     """
 
-    with get_connection() as conn:
-        with conn.cursor() as cur:
-            execute_batch(cur, query, rows, page_size=100)
-        conn.commit()
+    with transaction() as conn, conn.cursor() as cur:
+        execute_batch(cur, query, rows, page_size=100)
     print(f"✅ {len(rows)} enregistrements insérés dans season_training_data")
\ No newline at end of file